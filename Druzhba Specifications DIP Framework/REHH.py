@@ -1,5 +1,9 @@
-import http.server, socketserver, functools, xml.etree.ElementTree as ET, System
+import http.server, socketserver, functools, xml.etree.ElementTree as ET, System, threading, concurrent.futures, asyncio, signal, email.utils, time, gzip, hashlib, os, mimetypes, urllib.parse, collections, socket, select, struct, sys, stat, ctypes, ctypes.util, multiprocessing, multiprocessing.connection, bisect, json
 from http.server import HTTPServer, BaseHTTPRequestHandler
+try:
+    import brotli
+except ImportError:
+    brotli = None
 global Details
 # __    __   ____  ____   ____   ____  ____    ____  __
 #|  |__|  | /    ||    \ |    \ |    ||    \  /    ||  |
@@ -12,14 +16,1044 @@ global Details
 # Everything you see below is in EXTREME beta, so it has NO GUARANTEE
 # of working on your device. Please take Really Easy Http Hosting with
 # a grain of salt. Anyway, please actually test and provide feedback!
+class Page:
+    # A response body prepared once, up front: the encoded bytes plus gzip and
+    # (if the brotli package is installed) brotli versions, each with its own
+    # strong ETag. Serving it is then just picking one of the ready-made byte
+    # strings; nothing is encoded or compressed per request.
+    def __init__(self, body, content_type='text/html', max_age=0, compress=True):
+        self.content_type = content_type
+        self.cache_control = f"max-age={max_age}" if max_age else "no-cache"
+        tag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.variants = {'identity': (body, f'"{tag}"')}
+        if not compress:
+            self._choices = {}
+            return
+        gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(gzipped) < len(body):
+            self.variants['gzip'] = (gzipped, f'"{tag}-gz"')
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                self.variants['br'] = (compressed, f'"{tag}-br"')
+        self._choices = {}
+
+    def pick(self, accept_encoding):
+        # best variant the client accepts; remembered per Accept-Encoding value
+        # since browsers only ever send a handful of different ones
+        choice = self._choices.get(accept_encoding)
+        if choice is None:
+            accepted = set()
+            for item in (accept_encoding or '').split(','):
+                name, _, params = item.strip().partition(';')
+                q = params.strip()
+                if q.startswith('q=') and q[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+                    continue
+                accepted.add(name.strip().lower())
+            choice = next((e for e in ('br', 'gzip') if e in self.variants and (e in accepted or '*' in accepted)), 'identity')
+            if len(self._choices) > 256:
+                self._choices.clear()
+            self._choices[accept_encoding] = choice
+        return choice
+
+class FileRange:
+    # Part of an open file to send as a response body. The engines hand it to
+    # sendfile (socket.sendfile / loop.sendfile), so the kernel copies it
+    # straight from the page cache to the socket and it never sits in memory.
+    def __init__(self, file, offset, count):
+        self.file = file
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.file.close()
+
+# mimetypes misses or gets wrong a few types browsers care about
+MIME_TYPES = {
+    '.html': 'text/html', '.htm': 'text/html', '.css': 'text/css', '.js': 'text/javascript',
+    '.mjs': 'text/javascript', '.json': 'application/json', '.svg': 'image/svg+xml', '.wasm': 'application/wasm',
+    '.webp': 'image/webp', '.avif': 'image/avif', '.woff': 'font/woff', '.woff2': 'font/woff2',
+    '.txt': 'text/plain', '.xml': 'application/xml', '.ico': 'image/x-icon', '.map': 'application/json',
+}
+COMPRESSIBLE = ('text/', 'application/json', 'application/xml', 'application/javascript', 'image/svg+xml', 'application/wasm')
+
+def content_type_for(path):
+    ext = os.path.splitext(path)[1].lower()
+    kind = MIME_TYPES.get(ext) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    return kind + '; charset=utf-8' if kind.startswith('text/') or kind in ('application/json', 'application/xml') else kind
+
+def parse_range(value, size):
+    # "bytes=a-b" / "bytes=a-" / "bytes=-n" -> (start, end) inclusive; None
+    # to ignore it (multiple ranges, not bytes, garbage) and send the whole
+    # file; False if it can't be satisfied
+    unit, _, spec = value.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    try:
+        if not dash:
+            return None
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+class StaticFiles:
+    # <root>: serves a whole directory tree. Files up to SMALL_FILE bytes are
+    # read once and kept (with compressed copies for text types) in an LRU
+    # bounded by cache_bytes; bigger files are streamed with sendfile on every
+    # request, so memory use doesn't depend on file size. Range requests are
+    # supported for resumable downloads and media seeking.
+    # With a Watcher (hot reload on), what a URL maps to (file and its stat) is
+    # looked up once and then kept until the Watcher reports that file changed,
+    # so requests don't touch the filesystem except to open big files. Without
+    # one nothing would ever tell us, so every request stats the file itself. Small files used to be mmap'd, but
+    # a mapped file that's truncated while it's being edited kills the process
+    # with SIGBUS, and with hot reload files get edited under a running server.
+    SMALL_FILE = 256 * 1024
+    MAX_FILES = 10000
+
+    def __init__(self, directory, max_age=0, cache_bytes=64 * 1024 * 1024, watcher=None):
+        self.root = os.path.realpath(directory)
+        if not os.path.isdir(self.root):
+            System.retEx(f"<root> '{directory}' is not a directory")
+        self.max_age = max_age
+        self.cache_control = f"max-age={max_age}" if max_age else "no-cache"
+        self.cache_bytes = cache_bytes
+        self.watcher = watcher
+        self._files = {}  # URL path -> (file path or None, os.stat_result or None)
+        self._generation = 0
+        self._cache = collections.OrderedDict()  # path -> ((mtime_ns, size), Page)
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, url_path):
+        generation = self._generation
+        path = self.resolve(url_path)
+        if path is not None and self.watcher is not None:
+            self.watcher.watch(path)  # before the stat, so a change right after it isn't missed
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is not None and not stat.S_ISREG(st.st_mode):
+            st = None
+        entry = (path, st)
+        if self.watcher is None:
+            return entry
+        with self._lock:
+            if generation == self._generation:  # else invalidate() ran meanwhile and st may be stale
+                if len(self._files) >= self.MAX_FILES:  # random 404 URLs mustn't grow it forever
+                    if self.watcher is not None:
+                        for old, _ in self._files.values():
+                            self.watcher.forget(old)
+                    self._files.clear()
+                self._files[url_path] = entry
+        return entry
+
+    def invalidate(self, path=None):
+        # path changed on disk (a folder: everything under it); None: everything
+        with self._lock:
+            self._generation += 1
+            if path is None:
+                self._files.clear()
+                return
+            inside = path + os.sep
+            for url_path, (full, _) in list(self._files.items()):
+                if full is not None and (full == path or full.startswith(inside)):
+                    del self._files[url_path]
+
+    def resolve(self, target):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(target).path)
+        if '\0' in path:
+            return None
+        full = os.path.realpath(os.path.join(self.root, path.lstrip('/')))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None  # ../ tricks and symlinks pointing outside <root>
+        if os.path.isdir(full):
+            full = os.path.join(full, 'index.html')
+        return full
+
+    def cached_page(self, path, st):
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._cache.move_to_end(path)
+                return entry[1]
+        kind = content_type_for(path)
+        with open(path, 'rb') as f:
+            body = f.read()
+        page = Page(body, kind, self.max_age, compress=kind.startswith(COMPRESSIBLE))
+        with self._lock:
+            old = self._cache.pop(path, None)
+            if old is not None:
+                self._cached_bytes -= old[0][1]
+            self._cache[path] = (stamp, page)
+            self._cached_bytes += st.st_size
+            while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+                _, (old_stamp, _) = self._cache.popitem(last=False)
+                self._cached_bytes -= old_stamp[1]
+        return page
+
+    def respond(self, method, target, headers):
+        url_path = target.split('?', 1)[0]
+        entry = self._files.get(url_path)
+        path, st = entry if entry is not None else self.lookup(url_path)
+        if st is None:
+            body = b'404 Not Found'
+            return 404, [('Content-type', 'text/plain'), ('Content-Length', str(len(body)))], b'' if method == 'HEAD' else body
+        range_header = headers.get('range')
+        if st.st_size <= self.SMALL_FILE:
+            page = self.cached_page(path, st)
+            if not range_header:
+                return respond_page(page, method, headers)
+            data, etag = page.variants['identity']
+            kind = page.content_type
+        else:
+            data, etag, kind = None, f'"{st.st_mtime_ns:x}-{st.st_size:x}"', content_type_for(path)
+        response_headers = [('Content-type', kind), ('ETag', etag), ('Cache-Control', self.cache_control),
+                            ('Last-Modified', email.utils.formatdate(st.st_mtime, usegmt=True)), ('Accept-Ranges', 'bytes')]
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and etag_matches(if_none_match, etag):
+            return 304, response_headers, b''
+        size = st.st_size
+        status, start, end = 200, 0, size - 1
+        if range_header and headers.get('if-range', etag) == etag:
+            wanted = parse_range(range_header, size)
+            if wanted is False:
+                return 416, response_headers + [('Content-Range', f'bytes */{size}'), ('Content-Length', '0')], b''
+            if wanted is not None:
+                status, (start, end) = 206, wanted
+                response_headers.append(('Content-Range', f'bytes {start}-{end}/{size}'))
+        count = end - start + 1 if size else 0
+        response_headers.append(('Content-Length', str(count)))
+        if method == 'HEAD':
+            return status, response_headers, b''
+        if data is not None:
+            return status, response_headers, data[start:end + 1]
+        return status, response_headers, FileRange(open(path, 'rb'), start, count)
+
+def etag_matches(if_none_match, etag):
+    if if_none_match.strip() == '*':
+        return True
+    return any(candidate.strip().removeprefix('W/') == etag for candidate in if_none_match.split(','))
+
+PAGE = None
+STATIC = None
+METRICS_PATH = '/__rehh/metrics'
+SERVE_METRICS = False  # <metrics>1</metrics>
+ACCESS_LOG = None  # System.Logger for <accesslog>
+
+def respond(method, path, headers):
+    # Decides what a request gets back, for every engine: returns
+    # (status, [(header, value), ...], body). headers is looked up with
+    # lowercase names.
+    if SERVE_METRICS and path == METRICS_PATH:
+        body = METRICS.render()
+        return 200, [('Content-type', 'text/plain; version=0.0.4; charset=utf-8'), ('Cache-Control', 'no-store'),
+                     ('Content-Length', str(len(body)))], b'' if method == 'HEAD' else body
+    if STATIC is not None:
+        return STATIC.respond(method, path, headers)
+    return respond_page(PAGE, method, headers)
+
+def respond_page(page, method, headers):
+    encoding = page.pick(headers.get('accept-encoding'))
+    body, etag = page.variants[encoding]
+    response_headers = [('Content-type', page.content_type), ('ETag', etag),
+                        ('Cache-Control', page.cache_control), ('Vary', 'Accept-Encoding')]
+    if encoding != 'identity':
+        response_headers.append(('Content-Encoding', encoding))
+    if_none_match = headers.get('if-none-match')
+    if if_none_match and etag_matches(if_none_match, etag):
+        return 304, response_headers, b''
+    response_headers.append(('Content-Length', str(len(body))))
+    return 200, response_headers, b'' if method == 'HEAD' else body
+
+class Metrics:
+    # Request count, bytes sent and a latency histogram per status code, kept
+    # as one flat array of integers. In a <processes> worker the array is the
+    # supervisor's shared memory with a slot per worker, so whichever worker
+    # answers /__rehh/metrics reports the totals of all of them. Only one
+    # process writes each slot; the lock is for that process's threads.
+    STATUSES = (200, 206, 304, 400, 404, 416, 501, 503)  # the rest count as "other"
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    ROW = 3 + len(BUCKETS)  # count, bytes, microseconds, then one count per bucket
+    SIZE = (len(STATUSES) + 1) * ROW
+
+    def __init__(self, values=None, index=0, slots=1):
+        self.values = values if values is not None else (ctypes.c_uint64 * (self.SIZE * slots))()
+        self.slots = slots
+        base = index * self.SIZE
+        self._rows = {status: base + i * self.ROW for i, status in enumerate(self.STATUSES)}
+        self._other = base + len(self.STATUSES) * self.ROW
+        self._lock = threading.Lock()
+
+    def observe(self, status, nbytes, seconds):
+        row = self._rows.get(status, self._other)
+        bucket = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            values = self.values
+            values[row] += 1
+            values[row + 1] += nbytes
+            values[row + 2] += int(seconds * 1000000)
+            if bucket < len(self.BUCKETS):
+                values[row + 3 + bucket] += 1
+
+    def rows(self, slot=None):
+        # {status: [count, bytes, microseconds, per-bucket counts...]} summed
+        # over every slot, or for one
+        slots = range(self.slots) if slot is None else (slot,)
+        rows = {}
+        for i, status in enumerate(self.STATUSES + ('other',)):
+            row = [0] * self.ROW
+            for n in slots:
+                start = n * self.SIZE + i * self.ROW
+                row = [a + b for a, b in zip(row, self.values[start:start + self.ROW])]
+            if row[0]:
+                rows[status] = row
+        return rows
+
+    def render(self):
+        # Prometheus text format
+        rows = self.rows()
+        lines = ['# HELP rehh_requests_total Requests answered, by status code.',
+                 '# TYPE rehh_requests_total counter']
+        lines += [f'rehh_requests_total{{status="{status}"}} {row[0]}' for status, row in rows.items()]
+        lines += ['# HELP rehh_response_bytes_total Response body bytes sent, by status code.',
+                  '# TYPE rehh_response_bytes_total counter']
+        lines += [f'rehh_response_bytes_total{{status="{status}"}} {row[1]}' for status, row in rows.items()]
+        lines += ['# HELP rehh_request_duration_seconds Time from reading a request to having sent the response.',
+                  '# TYPE rehh_request_duration_seconds histogram']
+        for status, row in rows.items():
+            cumulative = 0
+            for le, count in zip(self.BUCKETS, row[3:]):
+                cumulative += count
+                lines.append(f'rehh_request_duration_seconds_bucket{{status="{status}",le="{le}"}} {cumulative}')
+            lines.append(f'rehh_request_duration_seconds_bucket{{status="{status}",le="+Inf"}} {row[0]}')
+            lines.append(f'rehh_request_duration_seconds_sum{{status="{status}"}} {row[2] / 1000000}')
+            lines.append(f'rehh_request_duration_seconds_count{{status="{status}"}} {row[0]}')
+        return ('\n'.join(lines) + '\n').encode()
+
+METRICS = Metrics()
+
+class AccessRecord(tuple):
+    # One <accesslog> line. Kept as a plain tuple until the log writer thread
+    # turns it into JSON, so a request only pays for building the tuple.
+    FIELDS = ('client', 'method', 'path', 'status', 'bytes', 'ms', 'agent', 'referer')
+
+    def __str__(self):
+        record = dict(zip(self.FIELDS, self))
+        record['ms'] = round(record['ms'] * 1000, 3)
+        return json.dumps(record)
+
+def finished(client, method, target, status, nbytes, started, headers):
+    # every engine calls this once a response has been sent
+    seconds = time.perf_counter() - started
+    METRICS.observe(status, nbytes, seconds)
+    if ACCESS_LOG is not None:
+        ACCESS_LOG.write(AccessRecord((client, method, target, status, nbytes, seconds,
+                                       headers.get('user-agent'), headers.get('referer'))))
+
+def open_access_log(path, index=None):
+    # a System.Logger (buffered, written by its own thread, rotated at 100 MB);
+    # <processes> workers each get their own file: access.log -> access.0.log
+    folder, name = os.path.split(os.path.abspath(path))
+    if index is not None:
+        stem, ext = os.path.splitext(name)
+        name = f"{stem}.{index}{ext}"
+    return System.Logger(folder, name, max_bytes=100 * 1024 * 1024, backup_count=10)
+
 class SimpleHandler(BaseHTTPRequestHandler):
+    # headers and body go out in separate writes; without TCP_NODELAY a
+    # kept-alive connection stalls ~40ms on delayed ACKs between them
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # with <keepalive> on, speak HTTP/1.1 so clients can reuse the
+        # connection, and drop it after that many idle seconds
+        keepalive = getattr(self.server, "keepalive", 0)
+        if keepalive:
+            self.protocol_version = "HTTP/1.1"
+            self.timeout = keepalive
+        super().setup()
+
     def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
+        started = time.perf_counter()
+        status, headers, body = respond(self.command, self.path, self.headers)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(HTML.encode())
-def start_rehh(location):
+        if isinstance(body, FileRange):
+            try:
+                self.connection.sendfile(body.file, body.offset, body.count)
+            finally:
+                body.close()
+        elif body:
+            self.wfile.write(body)
+        finished(self.client_address[0], self.command, self.path, status, len(body), started, self.headers)
+
+    do_HEAD = do_GET
+
+    def log_request(self, code='-', size='-'):
+        pass  # finished() records every request, with its timing
+
+    def log_message(self, format, *args):
+        # only errors (bad requests, idle keep-alive timeouts) still end up here.
+        # Without <accesslog> they're dropped: writing to stderr from the
+        # request thread is the per-request cost the access log removed.
+        if ACCESS_LOG is not None:
+            ACCESS_LOG.write(f"{self.address_string()} {format % args}")
+
+class PooledHTTPServer(HTTPServer):
+    # Serves connections on a fixed pool of <workers> threads, so one slow
+    # client no longer holds up everyone else. Up to <maxconnections> are
+    # accepted at once (the extra ones wait for a free worker); past that new
+    # connections get a 503 straight away instead of piling up.
+    request_queue_size = 128
+
+    def __init__(self, address, handler, workers, max_connections, keepalive, bind_and_activate=True):
+        self.workers = workers
+        self.max_connections = max(max_connections, workers)
+        self.keepalive = keepalive
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="REHH-worker")
+        self._active = 0
+        self._lock = threading.Lock()
+        super().__init__(address, handler, bind_and_activate)
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            busy = self._active >= self.max_connections
+            if not busy:
+                self._active += 1
+        if busy:
+            METRICS.observe(503, 0, 0.0)
+            try:
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nRetry-After: 1\r\nConnection: close\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._lock:
+                self._active -= 1
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+class AsyncServer:
+    # <engine>asyncio</engine>: one event loop serving every connection, so
+    # thousands of idle or slow clients cost almost nothing. Speaks just enough
+    # HTTP/1.1 for static content (GET/HEAD, keep-alive, pipelining: requests
+    # already sent down a connection are answered in order). Ctrl+C or SIGTERM
+    # stops accepting, lets requests in progress finish (up to `grace` seconds)
+    # and then exits.
+    MAX_HEADERS = 100
+    MAX_BODY = 64 * 1024  # GET/HEAD bodies are read and thrown away; bigger ones get 413
+    grace = 5
+    head_timeout = 10  # seconds to send a whole request head, so slow clients can't hold slots
+
+    def __init__(self, PORT, settings, listener=None, reuse_port=False):
+        self.port = int(PORT)
+        self.listener = listener  # already listening socket from the supervisor
+        self.reuse_port = reuse_port
+        self.keepalive = settings['keepalive']
+        self.max_connections = settings['maxconnections']
+        self.connections = {}  # task -> True while it's in the middle of a request
+        self.closing = False
+        self._date = (0, '')
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C still ends asyncio.run with KeyboardInterrupt
+        self.loop = loop
+        self.server = await self.listen(self.port)
+        await stop.wait()
+        self.server.close()
+        await self.drain_connections()
+        await self.server.wait_closed()
+
+    async def listen(self, port):
+        if self.listener is not None:
+            listener, self.listener = self.listener, None
+            return await asyncio.start_server(self.handle, sock=listener, backlog=1024)
+        return await asyncio.start_server(self.handle, "localhost", port, backlog=1024,
+                                          reuse_address=True, reuse_port=self.reuse_port or None)
+
+    def rebind(self, port):
+        # from another thread (the hot reload watcher): start listening on the
+        # new port, then stop listening on the old one. Connections already
+        # open on the old port carry on until they're done.
+        asyncio.run_coroutine_threadsafe(self._rebind(port), self.loop).result()
+
+    async def _rebind(self, port):
+        server = await self.listen(port)
+        old, self.server, self.port = self.server, server, port
+        old.close()
+
+    async def drain_connections(self):
+        self.closing = True
+        for task, busy in list(self.connections.items()):
+            if not busy:
+                task.cancel()
+        pending = list(self.connections)
+        if pending:
+            done, still_running = await asyncio.wait(pending, timeout=self.grace)
+            for task in still_running:
+                task.cancel()
+
+    def http_date(self):
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, email.utils.formatdate(now, usegmt=True))
+        return self._date[1]
+
+    def head(self, status, headers, keep_alive):
+        lines = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}", "Server: REHH", f"Date: {self.http_date()}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        if len(self.connections) >= self.max_connections or self.closing:
+            METRICS.observe(503, 0, 0.0)
+            writer.write(self.head(503, [('Content-Length', '0'), ('Retry-After', '1')], False))
+            writer.close()
+            return
+        self.connections[task] = False
+        peer = writer.get_extra_info('peername')
+        client = peer[0] if peer else '-'
+        try:
+            while not self.closing:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.keepalive or self.head_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not line:
+                    break
+                if line in (b"\r\n", b"\n"):
+                    continue  # stray blank line between pipelined requests
+                self.connections[task] = True
+                try:
+                    request = await asyncio.wait_for(self.read_request(line, reader), self.head_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not isinstance(request, tuple):
+                    writer.write(self.head(request or 400, [('Content-Length', '0')], False))
+                    break
+                method, target, keep_alive, headers = request
+                started = time.perf_counter()
+                keep_alive = keep_alive and self.keepalive > 0 and not self.closing
+                if method not in ('GET', 'HEAD'):
+                    status, response_headers, body = 501, [('Content-Length', '0')], b''
+                else:
+                    status, response_headers, body = respond(method, target, headers)
+                if isinstance(body, FileRange):
+                    try:
+                        writer.write(self.head(status, response_headers, keep_alive))
+                        await writer.drain()
+                        await asyncio.get_running_loop().sendfile(writer.transport, body.file, body.offset, body.count)
+                    finally:
+                        body.close()
+                else:
+                    writer.write(self.head(status, response_headers, keep_alive) + body)
+                    await writer.drain()
+                finished(client, method, target, status, len(body), started, headers)
+                self.connections[task] = False
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    async def read_request(self, line, reader):
+        # request line + headers -> (method, target, keep_alive, headers), None
+        # if it isn't HTTP we can answer, or 413 if the body is too big to skip
+        parts = line.decode('latin-1').rstrip("\r\n").split(" ")
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            return None
+        method, target, version = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= self.MAX_HEADERS:
+                return None
+            name, sep, value = line.decode('latin-1').partition(":")
+            if not sep:
+                return None
+            headers[name.strip().lower()] = value.strip()
+        if 'transfer-encoding' in headers:
+            return None
+        if headers.get('content-length'):
+            try:
+                length = int(headers['content-length'])
+            except ValueError:
+                return None
+            if length < 0:
+                return None
+            if length > self.MAX_BODY:
+                return 413
+            await reader.readexactly(length)  # not used, but must be skipped
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == "HTTP/1.1" else connection == 'keep-alive'
+        return method, target, keep_alive, headers
+
+def read_settings(root):
+    # optional tuning tags next to <port>; leaving them out keeps the original
+    # single-threaded server
+    def setting(tag, default):
+        element = root.find(tag)
+        if element is None or element.text is None or not element.text.strip():
+            return default
+        return int(element.text.strip())
+    engine = root.find('engine')
+    engine = engine.text.strip().lower() if engine is not None and engine.text else 'http.server'
+    if engine not in ('http.server', 'asyncio'):
+        System.retEx(f"Unknown <engine> '{engine}', use http.server or asyncio")
+    workers = setting('workers', 0)
+    accesslog = root.find('accesslog')
+    threaded = workers > 0 or engine == 'asyncio'
+    return {
+        'engine': engine,
+        'workers': workers,
+        'keepalive': setting('keepalive', 5 if threaded else 0),
+        'maxconnections': setting('maxconnections', 10000 if engine == 'asyncio' else workers * 4),
+        'maxage': setting('maxage', 0),
+        'reload': setting('reload', 1),
+        'processes': setting('processes', 1),
+        'metrics': setting('metrics', 0),
+        'accesslog': accesslog.text.strip() if accesslog is not None and accesslog.text and accesslog.text.strip() else None,
+    }
+
+def listen_socket(port, reuse_port=False):
+    return socket.create_server(("localhost", int(port)), backlog=1024, reuse_port=reuse_port)
+
+def make_server(PORT, settings, listener=None):
+    # listener: an already listening socket to serve on (<processes> workers)
+    if settings['workers'] > 0:
+        server = PooledHTTPServer(("localhost", int(PORT)), SimpleHandler, settings['workers'],
+                                  settings['maxconnections'], settings['keepalive'], bind_and_activate=listener is None)
+    else:
+        server = HTTPServer(("localhost", int(PORT)), SimpleHandler, bind_and_activate=listener is None)
+        server.keepalive = settings['keepalive']
+    if listener is not None:
+        server.socket.close()
+        server.socket = listener
+        server.server_address = listener.getsockname()
+        server.server_name, server.server_port = "localhost", server.server_address[1]
+    return server
+
+def serve_http(server):
+    # serve_forever, picked up again on the new listening socket when the hot
+    # reload changes <port> (Reloader.rebind leaves it in server.next_socket)
+    while True:
+        server.serve_forever()
+        listener = getattr(server, 'next_socket', None)
+        if listener is None:
+            return
+        old, server.socket, server.next_socket = server.socket, listener, None
+        server.server_address = listener.getsockname()
+        server.server_port = server.server_address[1]
+        # visitors that connected to the old port just before the switch
+        # still get their answer
+        old.setblocking(False)
+        while True:
+            try:
+                request, client_address = old.accept()
+            except OSError:
+                break
+            server.process_request(request, client_address)
+        old.close()
+
+class Watcher:
+    # Calls on_change(path) from a background thread when a watched file is
+    # created, changed, replaced or deleted (path None: lost track, assume
+    # everything changed). On Linux this is inotify, through ctypes, on the
+    # files' folders, so editors that save by writing a new file and renaming
+    # it over the old one are caught too. Elsewhere the watched files are
+    # stat'd every `interval` seconds instead.
+    IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x4, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF = 0x100, 0x200, 0x400, 0x800
+    IN_Q_OVERFLOW, IN_IGNORED = 0x4000, 0x8000
+    # no IN_MODIFY: wait for the writer to close the file, not every write()
+    EVENTS = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    interval = 1.0
+    settle = 0.05  # saving is often several events; gather them into one reload
+
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._stamps = {}  # polling: path -> stamp
+        self._folders = {}  # inotify: folder -> watch descriptor
+        self._wds = {}  # watch descriptor -> folder
+        self._fd = self.inotify()
+        loop = self._read_events if self._fd is not None else self._poll
+        threading.Thread(target=loop, name="REHH-watcher", daemon=True).start()
+
+    def inotify(self):
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return fd if fd >= 0 else None
+
+    @property
+    def kind(self):
+        return 'inotify' if self._fd is not None else f'polling every {self.interval:g}s'
+
+    @staticmethod
+    def stamp(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def watch(self, path):
+        path = os.path.abspath(path)
+        if self._fd is None:
+            with self._lock:
+                if path not in self._stamps:
+                    self._stamps[path] = self.stamp(path)
+            return
+        folder = os.path.dirname(path)
+        if folder in self._folders:
+            return
+        # a file in a folder that doesn't exist yet: watch the closest one that
+        # does, creating the folder shows up as a change of it
+        while not os.path.isdir(folder) and os.path.dirname(folder) != folder:
+            folder = os.path.dirname(folder)
+        with self._lock:
+            if folder not in self._folders:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), self.EVENTS)
+                if wd >= 0:
+                    self._folders[folder] = wd
+                    self._wds[wd] = folder
+
+    def forget(self, path):
+        if path is not None and self._fd is None:
+            with self._lock:
+                self._stamps.pop(os.path.abspath(path), None)
+
+    def _read_events(self):
+        while True:
+            select.select([self._fd], [], [])
+            changed = set()
+            while True:
+                changed.update(self._decode(os.read(self._fd, 65536)))
+                if not select.select([self._fd], [], [], self.settle)[0]:
+                    break
+            for path in changed:
+                self._dispatch(path)
+
+    def _decode(self, data):
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+            offset += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                yield None
+                continue
+            with self._lock:
+                folder = self._wds.get(wd)
+                if folder is not None and mask & self.IN_IGNORED:  # folder deleted, the watch is gone
+                    del self._wds[wd], self._folders[folder]
+            if folder is not None:
+                yield os.path.join(folder, os.fsdecode(name)) if name else folder
+
+    def _poll(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                watched = list(self._stamps.items())
+            for path, old in watched:
+                new = self.stamp(path)
+                if new != old:
+                    with self._lock:
+                        self._stamps[path] = new
+                    self._dispatch(path)
+
+    def _dispatch(self, path):
+        try:
+            self.on_change(path)
+        except Exception as e:
+            print(f"REHH: reload failed, still serving the previous version ({e})")
+
+class Reloader:
+    # Hot reload (<reload>, on by default): watches the XML config and what it
+    # serves, the <html> page file or the <root> folder. A changed page is
+    # re-read and pre-encoded into a new Page that replaces PAGE in one step, so
+    # a request gets either the old or the new page, never a mix, and requests
+    # already being answered finish with what they started with. A changed
+    # <port> opens the new port before the old one is closed. <engine> and
+    # <workers> still need a restart.
+    def __init__(self, location, PORT, settings, Details, reuse_port=False):
+        self.location = os.path.abspath(location)
+        self.port = int(PORT)
+        self.settings = settings
+        self.Details = Details
+        self.reuse_port = reuse_port
+        self.html_file = None
+        self.server = None
+        self.watcher = Watcher(self.changed)
+        self.watcher.watch(self.location)
+
+    def follow(self, html_file):
+        self.html_file = os.path.abspath(html_file) if html_file else None
+        if self.html_file:
+            self.watcher.watch(self.html_file)
+
+    def changed(self, path):
+        if path is None or path == self.location:
+            self.reload_config()
+        elif path == self.html_file:
+            with open(self.html_file, 'r') as f:
+                install_site(Page(f.read().encode(), max_age=self.settings['maxage']), None)
+            if self.Details: print(f"Reloaded {self.html_file}")
+        elif STATIC is not None:
+            STATIC.invalidate(path)
+
+    def reload_config(self):
+        global SERVE_METRICS
+        root = System.parse.file.xml(self.location)
+        settings = read_settings(root)
+        port = int(root.find('port').text)
+        page, static, html_file = load_site(root, settings, self.Details, self.watcher)
+        install_site(page, static)
+        self.follow(html_file)
+        SERVE_METRICS = bool(settings['metrics'])
+        for tag in ('engine', 'workers', 'processes', 'accesslog'):
+            if settings[tag] != self.settings[tag] and self.Details:
+                print(f"<{tag}> changed, restart REHH to use it")
+        self.settings.update(keepalive=settings['keepalive'], maxage=settings['maxage'])
+        server = self.server
+        if server is not None:
+            server.keepalive = settings['keepalive']
+            if hasattr(server, 'max_connections'):
+                server.max_connections = max(settings['maxconnections'], self.settings['workers'])
+        if self.Details: print(f"Reloaded {self.location}")
+        if port != self.port and server is not None:
+            self.rebind(port)
+
+    def rebind(self, port):
+        if self.settings['processes'] > 1 and not self.reuse_port:
+            if self.Details: print("<port> changed, restart REHH to use it (the workers share the supervisor's socket)")
+            return
+        if isinstance(self.server, AsyncServer):
+            self.server.rebind(port)
+        else:
+            # bound here first so a port that's taken leaves the old one serving
+            self.server.next_socket = listen_socket(port, self.reuse_port)
+            self.server.shutdown()  # serve_http switches over once serve_forever returns
+        self.port = port
+        if self.Details: print(f"Now serving at http://localhost:{port}")
+
+def install_site(page, static):
+    global PAGE, STATIC
+    # respond() looks at STATIC first, so set the new one before clearing the
+    # other: there's never a moment with neither
+    if static is not None:
+        STATIC = static
+    else:
+        PAGE = page
+        STATIC = None
+
+def load_site(root, settings, Details, watcher=None):
+    # the content part of the XML -> (Page, None, page file or None) or
+    # (None, StaticFiles, None)
     global HTML
+    site = root.find('root')
+    if site is not None and site.text and site.text.strip():
+        static = StaticFiles(site.text.strip(), max_age=settings['maxage'], watcher=watcher)
+        if Details: print(f"Serving directory {static.root}")
+        return None, static, None
+    html_file = None
+    if root.find('loc').text == 'diffloc':
+        html_file = root.find('html').text
+        print(html_file)
+        try:
+            with open(html_file, 'r') as f:
+                HTML = f.read()
+        except Exception as e:
+            System.retEx(e)
+        if Details: print(f"Serving files from {html_file}")
+    elif root.find('loc').text == 'webdoc':
+        HTML = root.find('html').text
+        print(HTML)
+    else:
+        System.retEx("You must define if html file is either locate here (diffloc) or on a web place (webdoc). Please look at the example XML file provided to build file for hosting.")
+    return Page(HTML.encode(), max_age=settings['maxage']), None, html_file
+
+class Supervisor:
+    # <processes>N: pre-fork mode. One Python process only ever runs on one
+    # core (the GIL), so this starts N worker processes that each run the
+    # configured engine on the same port. With SO_REUSEPORT (Linux, BSD,
+    # macOS) every worker has its own listening socket and the kernel spreads
+    # new connections over them; elsewhere the workers share one socket
+    # opened here. A worker that dies is started again (waiting longer each
+    # time if it keeps dying right away), and the request/byte counts of all
+    # workers are added up in stats().
+    def __init__(self, location, PORT, settings, Details):
+        self.location = location
+        self.port = int(PORT)
+        self.settings = settings
+        self.Details = Details
+        self.count = settings['processes']
+        self.reuse_port = hasattr(socket, 'SO_REUSEPORT')
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        self.shared = self.context.RawArray('Q', self.count * Metrics.SIZE)
+        self.workers = [None] * self.count
+        self.started = [0.0] * self.count
+        self.backoff = [0.0] * self.count
+        self.retry_at = [0.0] * self.count
+        self.restarts = 0
+        self.stopping = False
+
+    def start(self, index):
+        process = self.context.Process(target=run_worker, name=f"REHH-{index}", daemon=True,
+                                       args=(self.location, index, self.count, self.shared, self.listener,
+                                             self.reuse_port, self.Details and index == 0))
+        process.start()
+        self.workers[index] = process
+        self.started[index] = time.monotonic()
+
+    def run(self):
+        if self.reuse_port:
+            # every worker binds its own socket; check nothing else (another
+            # REHH included) has the port first, SO_REUSEPORT would share it
+            listen_socket(self.port).close()
+            self.listener = None
+        else:
+            self.listener = listen_socket(self.port)
+        # SIGTERM stops it like Ctrl+C; kill -USR1 prints the stats
+        previous = signal.signal(signal.SIGTERM, signal.default_int_handler)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.print_stats())
+        try:
+            for index in range(self.count):
+                self.start(index)
+            if self.Details: print(f"{self.count} processes serving http://localhost:{self.port}"
+                                   f" ({'SO_REUSEPORT' if self.reuse_port else 'shared socket'})")
+            while not self.stopping:
+                self.watch()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopping = True
+            signal.signal(signal.SIGTERM, previous)
+            self.shutdown()
+            if self.Details:
+                print(f"\nClosing server on http://localhost:{self.port}")
+                self.print_stats()
+
+    def watch(self):
+        now = time.monotonic()
+        waiting = [at for index, at in enumerate(self.retry_at) if self.workers[index] is None]
+        timeout = max(0.0, min(waiting) - now) if waiting else 1.0
+        sentinels = [process.sentinel for process in self.workers if process is not None]
+        multiprocessing.connection.wait(sentinels, timeout)
+        now = time.monotonic()
+        for index, process in enumerate(self.workers):
+            if self.stopping:
+                return
+            if process is not None and not process.is_alive():
+                process.join()
+                # crashing straight after starting: wait longer before each retry
+                quick = now - self.started[index] < 1
+                self.backoff[index] = min(max(self.backoff[index] * 2, 0.5), 30) if quick else 0
+                self.retry_at[index] = now + self.backoff[index]
+                self.workers[index] = None
+                if self.Details: print(f"REHH worker {index} exited ({process.exitcode}), restarting"
+                                       + (f" in {self.backoff[index]:g}s" if self.backoff[index] else ""))
+            if self.workers[index] is None and now >= self.retry_at[index]:
+                self.restarts += 1
+                self.start(index)
+
+    def shutdown(self):
+        # SIGTERM lets each worker finish what it's answering, like a lone
+        # REHH; whatever hasn't exited after the grace time is killed
+        workers = [process for process in self.workers if process is not None]
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + AsyncServer.grace + 1
+        for process in workers:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        if self.listener is not None:
+            self.listener.close()
+
+    def stats(self):
+        metrics = Metrics(self.shared, slots=self.count)
+        per_worker = []
+        for index in range(self.count):
+            rows = metrics.rows(index).values()
+            per_worker.append({'requests': sum(row[0] for row in rows), 'bytes': sum(row[1] for row in rows)})
+        return {'requests': sum(worker['requests'] for worker in per_worker),
+                'bytes': sum(worker['bytes'] for worker in per_worker),
+                'restarts': self.restarts, 'workers': per_worker}
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"{stats['requests']} requests, {stats['bytes']} bytes sent, {stats['restarts']} restarts; per process: "
+              + ", ".join(str(worker['requests']) for worker in stats['workers']))
+
+def run_worker(location, index, count, shared, listener, reuse_port, Details):
+    # a <processes> worker: the normal single-process server on the shared port
+    global METRICS
+    METRICS = Metrics(shared, index, count)
+    # SIGTERM from the supervisor ends serve_forever like Ctrl+C would (the
+    # asyncio engine installs its own graceful handler)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    root = System.parse.file.xml(location)
+    PORT = root.find('port').text
+    serve_site(location, root, PORT, read_settings(root), Details, listener, reuse_port, index)
+
+def start_rehh(location):
     root = System.parse.file.xml(location)
     if __name__ == "__main__":
         Details = True
@@ -30,29 +1064,54 @@ def start_rehh(location):
     try:
         PORT = root.find('port').text
         print(PORT)
-        if root.find('loc').text == 'diffloc':
-            HTML = root.find('html').text
-            print(HTML)
-            try:
-                with open(HTML, 'r') as f:
-                    HTML = f.read()
-            except Exception as e:
-                System.retEx(e)
-            if Details: print(f"Serving files from {HTML} at http://localhost:{PORT}")
-            try:
-                HTTPServer(("localhost", int(PORT)), SimpleHandler).serve_forever()
-            except KeyboardInterrupt:
-                if Details: print(f"\nClosing server on http://localhost:{PORT}")
-        elif root.find('loc').text == 'webdoc':
-            HTML = root.find('html').text
-            print(HTML)
-            if Details == True:
-                print(f"Serving files at http://localhost:{PORT}")
-            try:
-                HTTPServer(("localhost", int(PORT)), SimpleHandler).serve_forever()
-            except KeyboardInterrupt:
-                if Details: print(f"\nClosing server on http://localhost:{PORT}")
+        settings = read_settings(root)
+        if settings['processes'] > 1:
+            Supervisor(location, PORT, settings, Details).run()
         else:
-            System.retEx("You must define if html file is either locate here (diffloc) or on a web place (webdoc). Please look at the example XML file provided to build file for hosting.")
+            serve_site(location, root, PORT, settings, Details)
     except Exception as e:
         System.retEx(e)
+
+def serve_site(location, root, PORT, settings, Details, listener=None, reuse_port=False, index=None):
+    global SERVE_METRICS, ACCESS_LOG
+    SERVE_METRICS = bool(settings['metrics'])
+    if settings['accesslog']:
+        ACCESS_LOG = open_access_log(settings['accesslog'], index)
+    try:
+        run_engine(location, root, PORT, settings, Details, listener, reuse_port)
+    finally:
+        if ACCESS_LOG is not None:
+            ACCESS_LOG.close()  # a worker process skips atexit
+
+def run_engine(location, root, PORT, settings, Details, listener, reuse_port):
+    reloader = Reloader(location, PORT, settings, Details, reuse_port) if settings['reload'] else None
+    page, static, html_file = load_site(root, settings, Details, reloader.watcher if reloader else None)
+    install_site(page, static)
+    if reloader:
+        reloader.follow(html_file)
+        if Details: print(f"Hot reload on ({reloader.watcher.kind})")
+    if Details: print(f"Serving at http://localhost:{PORT}")
+    if settings['engine'] == 'asyncio':
+        if Details: print(f"asyncio engine, keep-alive {settings['keepalive']}s, max {settings['maxconnections']} connections")
+        server = AsyncServer(PORT, settings, listener, reuse_port)
+        if reloader:
+            reloader.server = server
+        try:
+            server.run()
+        except KeyboardInterrupt:
+            pass
+        if Details: print(f"\nClosing server on http://localhost:{server.port}")
+        return
+    if Details and settings['workers']:
+        print(f"{settings['workers']} workers, keep-alive {settings['keepalive']}s, max {settings['maxconnections']} connections")
+    if listener is None and reuse_port:
+        listener = listen_socket(PORT, reuse_port)
+    server = make_server(PORT, settings, listener)
+    if reloader:
+        reloader.server = server
+    try:
+        serve_http(server)
+    except KeyboardInterrupt:
+        if Details: print(f"\nClosing server on http://localhost:{server.server_port}")
+    finally:
+        server.server_close()
@@ -1,10 +1,189 @@
-import datetime, sys, os, json, requests, xml.etree.ElementTree as ET, csv, yaml, io, psutil, platform, subprocess, time, vlc, freecurrencyapi, urllib
-from playsound3 import playsound
-from plyer import notification
+import datetime, sys, os, json, xml.etree.ElementTree as ET, csv, io, platform, subprocess, time, urllib, collections, threading, atexit, gzip, shutil, operator, weakref, hashlib, pickle, copy, importlib, stat, contextlib, secrets, codecs, itertools, glob, math, mmap as _mmap
+from time import monotonic as _monotonic, time as _walltime
+
+
+class _LazyModule:
+    # Stand-in for a slow-to-import module. The real import happens the first
+    # time an attribute is looked up, and the module-level name is then rebound
+    # to the real module so later calls don't go through here. A missing
+    # package only errors once a feature that needs it is used.
+    def __init__(self, name, package=None):
+        self._name = name
+        self._package = package or name
+
+    def __getattr__(self, attr):
+        top = self._name.split(".")[0]
+        try:
+            importlib.import_module(self._name)
+        except ImportError as e:
+            raise ImportError(f"'{self._name}' is needed for this, install it with: pip install {self._package}") from e
+        module = sys.modules[top]
+        globals()[top] = module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'>"
+
+
+requests = _LazyModule("requests")
+yaml = _LazyModule("yaml", "pyyaml")
+psutil = _LazyModule("psutil")
+vlc = _LazyModule("vlc", "python-vlc")
+freecurrencyapi = _LazyModule("freecurrencyapi")
+asyncio = _LazyModule("asyncio")
+concurrent = _LazyModule("concurrent.futures")
+numpy = _LazyModule("numpy")
+pyarrow = _LazyModule("pyarrow.csv", "pyarrow")
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
 
 DIP_FRAMEWORK_VERSION = 1.0
 
-client = freecurrencyapi.Client('fca_live_Wka6rbO1pD7fslnGeLLxUkhczd94oC0BfGzIK7fL')
+@contextlib.contextmanager
+def _writing(path, binary=False, atomic=False, fsync=False, buffering=-1, newline=None):
+    # Opens path for the write functions. atomic=True writes a hidden temp
+    # file next to it and os.replace()s it over path at the end, so readers
+    # (and a crash halfway) only ever see the old file or the complete new one;
+    # if writing fails the temp file is removed and path is left alone.
+    # fsync=True also waits for the data (and the rename) to reach the disk.
+    mode = "wb" if binary else "w"
+    encoding = None if binary else "utf-8"
+    if not atomic:
+        with open(path, mode, buffering=buffering, encoding=encoding, newline=newline) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        return
+    folder, name = os.path.split(os.path.abspath(path))
+    temp = os.path.join(folder, f".{name}.{secrets.token_hex(4)}.tmp")
+    try:
+        with open(temp, mode.replace("w", "x"), buffering=buffering, encoding=encoding, newline=newline) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(temp, stat.S_IMODE(os.stat(path).st_mode))  # keep the old file's permissions
+        except FileNotFoundError:
+            pass
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    if fsync and os.name != "nt":
+        # the rename itself is only durable once the folder is synced
+        descriptor = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+def _yaml_backend():
+    # libyaml's C loader/dumper are several times faster than PyYAML's pure
+    # Python ones; use them whenever PyYAML was built with them. Worked out on
+    # first YAML use (so yaml isn't imported with System) and kept in
+    # YAML_LOADER / YAML_DUMPER / YAML_BACKEND.
+    global YAML_LOADER, YAML_DUMPER, YAML_BACKEND
+    if "YAML_LOADER" not in globals():
+        YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+        YAML_BACKEND = "libyaml" if hasattr(yaml, "CSafeLoader") else "pure-python"
+        YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return YAML_LOADER, YAML_DUMPER
+
+def __getattr__(name):
+    # lets System.YAML_BACKEND etc. be read before any YAML has been parsed
+    if name in ("YAML_LOADER", "YAML_DUMPER", "YAML_BACKEND"):
+        _yaml_backend()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# fastest JSON library installed: orjson, then ujson, then the stdlib json module
+JSON_BACKEND = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+JSON_CHUNK_SIZE = 64 * 1024
+
+_DIGITS_AS_ZERO = bytes(48 if 48 <= c <= 57 else 32 for c in range(256))  # "0".."9" -> "0", rest -> " "
+
+def _long_digits(data):
+    # True if data has a run of 19+ digits, which could be an integer past 64
+    # bits; orjson would read that as a float. Two C passes, no regex (which was
+    # slower than the parse itself). A long digit string inside a JSON string
+    # also matches, which only costs speed.
+    if isinstance(data, str):
+        data = data.encode("utf-8", "surrogatepass")
+    return b"0" * 19 in bytes(data).translate(_DIGITS_AS_ZERO)
+
+def _nonfinite(obj):
+    # True if obj holds a NaN or infinity anywhere. orjson writes those as null
+    # without complaining, where the stdlib writes NaN / Infinity.
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        if kind is dict:
+            stack.extend(value.values())
+        elif kind is list or kind is tuple:
+            stack.extend(value)
+        elif isinstance(value, float) and not math.isfinite(value):
+            return True
+    return False
+
+def _json_loads(data):
+    # data can be bytes or str. Anything the fast library won't take (NaN, bad
+    # JSON) or could get wrong (see _long_digits) goes through the stdlib so
+    # results and errors match.
+    if (orjson is not None or ujson is not None) and not _long_digits(data):
+        try:
+            if orjson is not None:
+                return orjson.loads(data)
+            return ujson.loads(data)
+        except Exception:
+            pass
+    return json.loads(data)
+
+def _json_dump(obj, f):
+    # writes obj to the binary file f. The stdlib path encodes a top-level
+    # list/dict one item at a time with the C encoder (iterencode is pure
+    # Python) and writes the pieces in JSON_CHUNK_SIZE blocks, so a huge object
+    # is never held as one big string. NaN/Infinity always end up on the stdlib
+    # path so they come out the same whichever library is installed; orjson's
+    # output only needs the (slow) _nonfinite walk if it contains a null at all.
+    try:
+        if orjson is not None:
+            data = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+            if b"null" not in data or not _nonfinite(obj):
+                f.write(data)
+                return
+        elif ujson is not None:
+            f.write(ujson.dumps(obj).encode("utf-8"))
+            return
+    except Exception:
+        pass
+    encode = json.JSONEncoder().encode
+    if isinstance(obj, list):
+        pieces = ("[", *((", " if i else "") + encode(item) for i, item in enumerate(obj)), "]")
+    elif isinstance(obj, dict):
+        pieces = ("{", *((", " if i else "") + encode({key: value})[1:-1] for i, (key, value) in enumerate(obj.items())), "}")
+    else:
+        pieces = (encode(obj),)
+    chunk, size = [], 0
+    for piece in pieces:
+        chunk.append(piece)
+        size += len(piece)
+        if size >= JSON_CHUNK_SIZE:
+            f.write("".join(chunk).encode("utf-8"))
+            chunk, size = [], 0
+    if chunk:
+        f.write("".join(chunk).encode("utf-8"))
 
 
 class time:
@@ -68,43 +247,128 @@ class sysIf:
 class computer:
     class file:
         class write:
+            # every writer takes atomic=True (temp file + os.replace, see
+            # _writing) and fsync=True
+            csv_buffer_size = 1024 * 1024
+
             @staticmethod
-            def write_file(filepath, content):
+            def write_file(filepath, content, atomic=False, fsync=False):
                 try:
-                    with open(filepath, "w", encoding="utf-8") as f:
+                    with _writing(filepath, atomic=atomic, fsync=fsync) as f:
                         f.write(content)
                 except Exception as e:
                     retEx(e)
             @staticmethod
-            def write_json(path, json_data):
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(json.dump(json_data, f))
+            def write_json(path, json_data, atomic=False, fsync=False):
+                with _writing(path, binary=True, atomic=atomic, fsync=fsync) as f:
+                    _json_dump(json_data, f)
+            @staticmethod
+            def write_csv(path, csv_data, atomic=False, fsync=False, buffer_size=None):
+                # csv_data can be any iterable of rows, a generator included;
+                # rows are written as they come (writerows), never all held at
+                # once, through a buffer_size byte buffer
+                buffer_size = buffer_size or computer.file.write.csv_buffer_size
+                with _writing(path, atomic=atomic, fsync=fsync, buffering=buffer_size, newline="") as f:
+                    csv.writer(f, delimiter=',').writerows(csv_data)
+                    #Data is meant to be saved like this in this framework:
+                    #data = [
+                    #['Name', 'Department', 'Birthday Month'],
+                    #['John Smith', 'Accounting', 'November'],
+                    #['Erica Meyers', 'IT', 'March']
+                    #]
             @staticmethod
-            def write_csv(path, csv_data):
-                with open(path, "w", encoding="utf-8") as f:
-                    csv_writer = csv.writer(f, delimiter=',')
-                    for row in csv_data:
-                        csv_writer.writerow(row)
-                        #Data is meant to be saved like this in this framework:
-                        #data = [
-                        #['Name', 'Department', 'Birthday Month'],
-                        #['John Smith', 'Accounting', 'November'],
-                        #['Erica Meyers', 'IT', 'March']
-                        #]
+            def write_yaml(path, yaml_data, atomic=False, fsync=False):
+                with _writing(path, atomic=atomic, fsync=fsync) as f:
+                    yaml.dump(yaml_data, f, Dumper=_yaml_backend()[1], default_flow_style=False)
             @staticmethod
-            def write_yaml(path, yaml_data):
-                with open(path, 'w', encoding="utf-8") as f:
-                    f.write(yaml.dump(yaml_data, f, default_flow_style=False))
+            def append_stream(path, fmt="text", buffer_size=None, fsync=False):
+                # an AppendWriter for adding to path bit by bit
+                try:
+                    return AppendWriter(path, fmt, buffer_size, fsync)
+                except Exception as e:
+                    retEx(e)
 
         class read:
+            # Whole files, or pieces of them so big files never have to fit in
+            # memory at once. Binary reads go through unbuffered handles, so
+            # data is copied once, from the OS straight into the result.
+            chunk_size = 1024 * 1024
+
             @staticmethod
-            def read_file(path):
+            def _stat(path):
+                # the one existence check: a stat, None if missing or not a file
                 try:
-                    if computer.file.ensure_dir(path, False):
-                        with open(path, "r", encoding="utf-8") as f:
-                            return f.read
-                    else:
+                    st = os.stat(path)
+                except (FileNotFoundError, NotADirectoryError):
+                    return None
+                return st if stat.S_ISREG(st.st_mode) else None
+
+            @staticmethod
+            def read_file(path, binary=False, mmap=False):
+                # str (UTF-8), bytes with binary=True, or with mmap=True a
+                # read-only memoryview of the file mapped into memory: nothing
+                # is copied and only the parts used are loaded, good for big
+                # binary files (don't shrink the file while the view is in use).
+                # None if the file doesn't exist.
+                try:
+                    st = computer.file.read._stat(path)
+                    if st is None:
                         return None
+                    if mmap:
+                        if st.st_size == 0:
+                            return memoryview(b"")  # can't map an empty file
+                        with open(path, "rb", buffering=0) as f:
+                            return memoryview(_mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ))
+                    if binary:
+                        with open(path, "rb", buffering=0) as f:
+                            return f.read()
+                    with open(path, "r", encoding="utf-8") as f:
+                        return f.read()
+                except Exception as e:
+                    retEx(e)
+
+            @staticmethod
+            def iter_chunks(path, size=None):
+                # bytes, size (default chunk_size) at a time
+                size = size or computer.file.read.chunk_size
+                try:
+                    with open(path, "rb", buffering=0) as f:
+                        while True:
+                            chunk = f.read(size)
+                            if not chunk:
+                                return
+                            yield chunk
+                except Exception as e:
+                    retEx(e)
+
+            @staticmethod
+            def iter_lines(path, encoding="utf-8"):
+                # lines without their line ending, one at a time
+                try:
+                    with open(path, "r", encoding=encoding) as f:
+                        for line in f:
+                            yield line[:-1] if line.endswith("\n") else line
+                except Exception as e:
+                    retEx(e)
+
+            @staticmethod
+            def readinto(path, buffer, offset=0):
+                # fills a buffer you made (bytearray, memoryview, NumPy array...)
+                # from the file, starting offset bytes in; returns how many bytes
+                # were read (less than the buffer only at the end of the file).
+                # Reusing one buffer for many reads allocates nothing.
+                try:
+                    view = memoryview(buffer).cast("B")
+                    with open(path, "rb", buffering=0) as f:
+                        if offset:
+                            f.seek(offset)
+                        filled = 0
+                        while filled < len(view):
+                            n = f.readinto(view[filled:])
+                            if not n:
+                                break
+                            filled += n
+                        return filled
                 except Exception as e:
                     retEx(e)
         @staticmethod
@@ -123,6 +387,7 @@ class computer:
 
     @staticmethod
     def notify(title, message, appname):
+        from plyer import notification
         notification.notify(
             title=title,
             message=message,
@@ -132,23 +397,40 @@ class computer:
     @staticmethod
     def playsound(location):
         try:
+            from playsound3 import playsound
             playsound(location)
         except Exception as e:
             retEx(e)
+    # one VLC instance for every video (making one takes a while) and the
+    # players of finished videos, so back-to-back clips reuse their window
+    _vlc = None
+    _players = []
+    _vlc_lock = threading.Lock()
+
     @staticmethod
-    def playvideo(location):
+    def _player():
+        with computer._vlc_lock:
+            if computer._vlc is None:
+                computer._vlc = vlc.Instance()
+            if computer._players:
+                return computer._vlc, computer._players.pop()
+            return computer._vlc, computer._vlc.media_player_new()
+
+    @staticmethod
+    def playvideo(location, wait=True):
+        # wait=False returns straight away with a VideoPlayback handle
+        # (wait(), stop(), progress); otherwise it returns once the video has
+        # finished
         try:
-            instance = vlc.Instance()
-            player = instance.media_player_new()
-            media = instance.media_new(location)
-            player.set_media(media)
+            instance, player = computer._player()
+            player.set_media(instance.media_new(location))
+            playback = VideoPlayback(player)
             player.play()
-
-            # DO NOT REMOVE! KEEPS SCRIPT RUNNING WHILE VIDEO PLAYING TO NOT
-            # STOP SCRIPT, BUT CAN BE DISABLED BY PUTTING "disable" INTO THE
-            # SECOND PROMPT
-            while player.is_playing():
-                 time.sleep(1)
+            if wait:
+                playback.wait()
+                if playback.error:
+                    retEx(f"VLC could not play {location}")
+            return playback
         except Exception as e:
             retEx(e)
     @staticmethod
@@ -202,83 +484,1373 @@ def openbrowserlink(url):
         retEx(e)
 
 def info():
-    print(f"OS: {sys.platform}, OS VERSION: {platform.platform} DIP FRAMEWORK VERSION: {DIP_FRAMEWORK_VERSION}, CPU TEMP: {psutil.sensors_temperatures()} CPU: {platform.processor()} PYTHON VERSION: {sys.version}")
+    _yaml_backend()
+    print(f"OS: {sys.platform}, OS VERSION: {platform.platform} DIP FRAMEWORK VERSION: {DIP_FRAMEWORK_VERSION}, YAML BACKEND: {YAML_BACKEND}, JSON BACKEND: {JSON_BACKEND}, CPU TEMP: {psutil.sensors_temperatures()} CPU: {platform.processor()} PYTHON VERSION: {sys.version}")
 
-def log(log):
-    log_dir = "DIP_Framework"
-    log_file = os.path.join(log_dir, "log.txt")
-    os.makedirs(log_dir, exist_ok=True)
-    try:
-        if os.path.exists(log_file):
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"{datetime.datetime.now()} || {log}\n")
+class Logger:
+    # Buffered log writer. write() only timestamps the line and appends it to an
+    # in-memory queue; a background thread appends queued lines to one open file
+    # handle in batches, when batch_size lines are waiting or every
+    # flush_interval seconds. sync=True skips the thread and writes each line
+    # straight away (still through the one handle).
+    #
+    # Rotation: when the file would pass max_bytes, or the first line of a new
+    # day arrives (daily=True), the current file is renamed to a timestamped
+    # segment and a fresh one is started with the usual header. Old segments
+    # are gzipped on their own thread and only the newest backup_count kept.
+    #
+    # Fork: the threads don't exist in a forked child, so every Logger is reset
+    # there (_after_fork) and starts its own writer on its first line.
+    _instances = weakref.WeakSet()
 
+    def __init__(self, log_dir="DIP_Framework", filename="log.txt", batch_size=512, flush_interval=0.5, sync=False,
+                 max_bytes=0, daily=False, backup_count=10, compress=True):
+        self.log_dir = log_dir
+        self.log_file = os.path.join(log_dir, filename)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sync = sync
+        self.max_bytes = max_bytes
+        self.daily = daily
+        self.backup_count = backup_count
+        self.compress = compress
+        self._size = 0
+        self._day = None
+        self._archivers = []
+        self._archive_lock = threading.Lock()
+        self._pending = collections.deque()
+        self._wakeup = threading.Event()
+        self._done = threading.Condition()
+        self._requested = 0
+        self._completed = 0
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._handle = None
+        self._thread = None
+        self._error = None
+        self._forked = False
+        Logger._instances.add(self)
+        atexit.register(self.close)
+
+    def write(self, message):
+        if self._error is not None:
+            self._raise_pending()
+        if self.sync:
+            with self._lock:
+                self._write_batch([(datetime.datetime.now(), message)])
+            self._raise_pending()  # this call's own failure, not the next one's
+            return
+        if self._thread is None:
+            self._start()
+        self._pending.append((datetime.datetime.now(), message))
+        if len(self._pending) >= self.batch_size and not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def flush(self):
+        if self._thread is not None and self._thread.is_alive():
+            with self._done:
+                self._requested += 1
+                target = self._requested
+                self._wakeup.set()
+                self._done.wait_for(lambda: self._completed >= target or not self._thread.is_alive())
         else:
-            with open(log_file, "w", encoding="utf-8") as f:
-                f.write(f'DIP LOG v{DIP_FRAMEWORK_VERSION} \nLog created {datetime.datetime.now()} \n {datetime.datetime.now()} || {log}\n')
-                f.write(f"{datetime.datetime.now()} || {log}\n")
+            self._drain()  # no writer thread (sync mode, or it's gone): write here
+        self._raise_pending()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._stopping = True
+            self._wakeup.set()
+            self._thread.join()
+        self._thread = None
+        self._stopping = False
+        self._drain()  # anything the writer thread never got to
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            archivers, self._archivers = self._archivers, []
+        for archiver in archivers:
+            archiver.join()
+        self._raise_pending()
+
+    def _reset_after_fork(self):
+        # lines queued before the fork belong to the parent, which writes them;
+        # the file is reopened on this process's first write
+        self._thread = None
+        self._archivers = []
+        self._pending.clear()
+        self._lock = threading.Lock()
+        self._archive_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._done = threading.Condition()
+        self._requested = self._completed = 0
+        self._stopping = False
+        self._error = None
+        self._handle = None
+        self._forked = True
+
+    @staticmethod
+    def _after_fork():
+        for logger in list(Logger._instances):
+            logger._reset_after_fork()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="DIP-log-writer", daemon=True)
+                self._thread.start()
+                mp_util = sys.modules.get("multiprocessing.util")
+                if self._forked and mp_util is not None:
+                    # a multiprocessing child ends with os._exit, skipping atexit;
+                    # registered here because it clears its finalizers after forking
+                    mp_util.Finalize(None, self.close, exitpriority=0)
+
+    def _raise_pending(self):
+        if self._error is not None:
+            e, self._error = self._error, None
+            retEx(e)
+
+    def _open(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._handle = open(self.log_file, "ab")
+        stat = os.fstat(self._handle.fileno())
+        self._size = stat.st_size
+        self._day = datetime.date.fromtimestamp(stat.st_mtime) if stat.st_size else datetime.date.today()
+        if self._size == 0:
+            header = f'DIP LOG v{DIP_FRAMEWORK_VERSION} \nLog created {datetime.datetime.now()} \n'.encode("utf-8")
+            self._handle.write(header)
+            self._size += len(header)
+
+    def _write_batch(self, entries):
+        try:
+            data = "".join(f"{stamp} || {message}\n" for stamp, message in entries).encode("utf-8")
+            if self._handle is None:
+                self._open()
+            if (self.max_bytes and self._size + len(data) > self.max_bytes and self._size > 0) \
+                    or (self.daily and entries[0][0].date() != self._day):
+                self._rotate()
+                self._open()
+            self._handle.write(data)
+            self._handle.flush()
+            self._size += len(data)
+        except Exception as e:
+            self._error = e
+
+    def _rotate(self):
+        self._handle.close()
+        self._handle = None
+        segment = f"{self.log_file}.{datetime.datetime.now():%Y%m%d-%H%M%S-%f}"
+        os.replace(self.log_file, segment)
+        archiver = threading.Thread(target=self._archive, args=(segment,), name="DIP-log-archiver", daemon=True)
+        self._archivers = [t for t in self._archivers if t.is_alive()]
+        self._archivers.append(archiver)
+        archiver.start()
+
+    def _archive(self, segment):
+        try:
+            with self._archive_lock:
+                self._compress_and_prune(segment)
+        except Exception as e:
+            self._error = e
+
+    def _compress_and_prune(self, segment):
+        if self.compress:
+            try:
+                with open(segment, "rb") as src, gzip.open(segment + ".gz.tmp", "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            except FileNotFoundError:
+                pass  # already gone (removed by hand); still prune below
+            else:
+                os.replace(segment + ".gz.tmp", segment + ".gz")
+                os.remove(segment)
+        # with compress on, only finished .gz archives count: a raw segment is
+        # still waiting for its own archiver thread, which would find it gone
+        prefix = os.path.basename(self.log_file) + "."
+        segments = sorted(name for name in os.listdir(self.log_dir)
+                          if name.startswith(prefix) and not name.endswith(".tmp")
+                          and (not self.compress or name.endswith(".gz")))
+        for name in segments[:max(len(segments) - self.backup_count, 0)]:
+            os.remove(os.path.join(self.log_dir, name))
+
+    def _drain(self):
+        pending = self._pending
+        while pending:
+            entries = [pending.popleft() for _ in range(min(len(pending), self.batch_size))]
+            with self._lock:
+                self._write_batch(entries)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            stopping = self._stopping
+            with self._done:
+                target = self._requested
+            self._drain()
+            with self._done:
+                self._completed = target
+                self._done.notify_all()
+            if stopping:
+                return
+
+logger = Logger()
+if hasattr(os, "register_at_fork"):  # not on Windows, which can't fork
+    os.register_at_fork(after_in_child=Logger._after_fork)
+
+class AppendWriter:
+    # Adds to the end of a file for as long as it's open, for long-running
+    # exports. write() takes one line of text (fmt="text"), one row
+    # (fmt="csv") or one object written as a JSON line (fmt="json"). Output is
+    # gathered in a buffer_size buffer and written in large blocks; flush()
+    # pushes it to the file (and to the disk with fsync=True), close() or the
+    # end of a with block does too. Appending means a crash only ever loses
+    # the unflushed end, never what's already in the file.
+    def __init__(self, path, fmt="text", buffer_size=None, fsync=False):
+        if fmt not in ("text", "csv", "json"):
+            retEx(f"unknown append format {fmt!r}, use text, csv or json")
+        self.path = path
+        self.fmt = fmt
+        self.fsync = fsync
+        buffer_size = buffer_size or computer.file.write.csv_buffer_size
+        if fmt == "json":
+            self._file = open(path, "ab", buffering=buffer_size)
+        else:
+            self._file = open(path, "a", buffering=buffer_size, encoding="utf-8", newline="" if fmt == "csv" else None)
+        self._csv = csv.writer(self._file) if fmt == "csv" else None
+
+    def write(self, item):
+        if self.fmt == "csv":
+            self._csv.writerow(item)
+        elif self.fmt == "json":
+            _json_dump(item, self._file)
+            self._file.write(b"\n")
+        else:
+            self._file.write(item if item.endswith("\n") else item + "\n")
+
+    def writemany(self, items):
+        if self.fmt == "csv":
+            self._csv.writerows(items)
+            return
+        for item in items:
+            self.write(item)
+
+    def flush(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class VideoPlayback:
+    # A video started by computer.playvideo. VLC reports the end (or a stop or
+    # an error) through its event manager, from its own thread; that only sets
+    # an Event, so wait() sleeps until then rather than polling is_playing().
+    # Once it's finished with, the player goes back to computer for the next
+    # video.
+    EVENTS = ("MediaPlayerEndReached", "MediaPlayerStopped", "MediaPlayerEncounteredError")
+    MAX_IDLE_PLAYERS = 4
+
+    def __init__(self, player):
+        self.player = player
+        self.error = False
+        self.ended = False
+        self._finished = threading.Event()
+        self._released = False
+        self._final = None
+        self._lock = threading.Lock()
+        events = player.event_manager()
+        for name in self.EVENTS:
+            events.event_attach(getattr(vlc.EventType, name), self._on_event)
+
+    def _on_event(self, event):
+        # on a VLC thread: calling back into libvlc from here can deadlock
+        if event.type == vlc.EventType.MediaPlayerEncounteredError:
+            self.error = True
+        elif event.type == vlc.EventType.MediaPlayerEndReached:
+            self.ended = True
+        self._finished.set()
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    @property
+    def progress(self):
+        # share played so far, 0.0 to 1.0
+        if self.ended:
+            return 1.0
+        if self._final is not None:
+            return self._final[0]
+        return max(self.player.get_position(), 0.0)
+
+    @property
+    def elapsed(self):
+        # seconds played so far
+        if self._final is not None:
+            return self._final[1]
+        return max(self.player.get_time(), 0) / 1000
+
+    @property
+    def duration(self):
+        # length in seconds, 0 until VLC knows it
+        if self._final is not None:
+            return self._final[2]
+        return max(self.player.get_length(), 0) / 1000
+
+    def wait(self, timeout=None):
+        # True once the video is over, False if timeout ran out first
+        finished = self._finished.wait(timeout)
+        if finished:
+            self._release()
+        return finished
+
+    def stop(self):
+        self._release()
+        self._finished.set()
+
+    def _release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._final = (self.progress, self.elapsed, self.duration)
+            self._released = True
+        player = self.player
+        events = player.event_manager()
+        for name in self.EVENTS:
+            events.event_detach(getattr(vlc.EventType, name))
+        player.stop()
+        with computer._vlc_lock:
+            if len(computer._players) < self.MAX_IDLE_PLAYERS:
+                computer._players.append(player)
+            else:
+                player.release()
+
+def log(log):
+    try:
+        logger.write(log)
     except Exception as e:
         retEx(e)
 
+def _csv_rows(file, chunk_size=None, columns=None, tuples=False):
+    # Rows of an open CSV text stream, one at a time, so memory stays flat no
+    # matter how big the file is. columns keeps only those columns (in that
+    # order); tuples=True gives one namedtuple type per file instead of a dict
+    # per row; chunk_size groups rows into lists of that many.
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    width = len(header)
+    names = header
+    index = None
+    if columns is not None:
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise Exception(f"Columns not in CSV header: {missing}")
+        names = list(columns)
+        index = [header.index(c) for c in columns]
+        pick = operator.itemgetter(*index) if len(index) > 1 else (lambda row, i=index[0]: (row[i],))
+    row_type = collections.namedtuple("Row", names, rename=True) if tuples else None
+
+    def build(row):
+        if len(row) != width:
+            if not row:
+                return None
+            if not tuples and index is None:
+                extra = row[width:]
+                record = dict(zip(header, row + [None] * (width - len(row))))
+                if extra:
+                    record[None] = extra
+                return record
+            row = (row + [None] * width)[:width]
+        if index is not None:
+            row = pick(row)
+        return row_type._make(row) if tuples else dict(zip(names, row))
+
+    if not chunk_size:
+        for row in reader:
+            record = build(row)
+            if record is not None:
+                yield record
+        return
+    chunk = []
+    for row in reader:
+        record = build(row)
+        if record is not None:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+# Columnar CSV: every column comes back as one typed array instead of a dict of
+# strings per row. With pyarrow installed that's a pyarrow Table (parsed in C,
+# on all cores); otherwise a dict of NumPy arrays, filled _CHUNK_ROWS rows at a
+# time so only one chunk of strings is alive at once. schema maps column names
+# to a type (int, float, bool, str, or a dtype / pyarrow type name); columns
+# without one are inferred: int64, then float64 (blanks become NaN), then bool
+# for true/false, else str (object arrays, or Arrow strings).
+_CHUNK_ROWS = 65536
+_PY_TYPES = {int: "int64", float: "float64", bool: "bool", str: "str"}
+
+def _columnar_backend(backend, ragged="error"):
+    # ragged says what to do with a row that has more or fewer cells than the
+    # header: "error" (both backends), "skip" it (both) or "pad" it with empty
+    # cells / cut it to size, which pyarrow can't do, so it means NumPy
+    if ragged not in ("error", "skip", "pad"):
+        raise Exception(f"Unknown ragged '{ragged}', use error, skip or pad")
+    if ragged == "pad":
+        if backend == "arrow":
+            raise Exception("ragged='pad' needs the numpy backend")
+        backend = "numpy"
+    if backend in ("numpy", "arrow"):
+        return backend
+    if backend not in (None, "auto"):
+        raise Exception(f"Unknown backend '{backend}', use auto, numpy or arrow")
+    try:
+        pyarrow.csv
+        return "arrow"
+    except ImportError:
+        return "numpy"
+
+def _csv_bools(values):
+    # one lookup per distinct value instead of lowercasing every cell
+    flags = {value: value.strip().lower() in ("true", "1", "yes") for value in set(values)}
+    return numpy.fromiter(map(flags.__getitem__, values), bool, len(values))
+
+def _csv_array(values, kind=None):
+    # one column of strings -> typed NumPy array; kind None means infer. NumPy
+    # parses the strings itself, so a failed guess costs one early ValueError.
+    kind = _PY_TYPES.get(kind, kind)
+    if kind in ("str", "object"):
+        return numpy.array(values, dtype=object)
+    if kind == "bool":
+        return _csv_bools(values)
+    if kind is not None:
+        dtype = numpy.dtype(kind)
+        if dtype.kind == "f" and "" in values:
+            values = ["nan" if value == "" else value for value in values]
+        return numpy.array(values, dtype=dtype)
+    for dtype in (numpy.int64, numpy.float64):
+        try:
+            return numpy.array(values, dtype=dtype)
+        except (ValueError, OverflowError):
+            pass
+    if "" in values:
+        try:
+            return numpy.array(["nan" if value == "" else value for value in values], dtype=numpy.float64)
+        except ValueError:
+            pass
+    distinct = set(values)
+    if distinct and all(value.strip().lower() in ("true", "false") for value in distinct):
+        return _csv_bools(values)
+    return numpy.array(values, dtype=object)
+
+def _csv_layout(file, columns=None):
+    # csv.reader over a text stream with the header read off: (reader, width,
+    # names, index), names being the columns kept and index their positions
+    reader = csv.reader(file)
+    header = next(reader, None) or []
+    names = list(columns) if columns is not None else header
+    missing = [c for c in names if c not in header]
+    if missing:
+        raise Exception(f"Columns not in CSV header: {missing}")
+    return reader, len(header), names, [header.index(c) for c in names]
+
+def _numpy_chunks(layout, chunk_size, schema=None, ragged="error"):
+    # dicts of column name -> array, chunk_size rows each. Blank lines are
+    # skipped and other ragged rows handled as _columnar_backend describes.
+    reader, width, names, index = layout
+    schema = schema or {}
+    while True:
+        rows = list(itertools.islice(reader, chunk_size))
+        if not rows:
+            return
+        if set(map(len, rows)) != {width}:
+            rows = [row for row in rows if row]
+            if ragged == "pad":
+                rows = [(row + [""] * width)[:width] for row in rows]
+            else:
+                bad = [row for row in rows if len(row) != width]
+                if bad and ragged == "error":
+                    raise Exception(f"CSV parse error: Expected {width} columns, got {len(bad[0])}: {','.join(bad[0])}")
+                if bad:
+                    rows = [row for row in rows if len(row) == width]
+            if not rows:
+                continue
+        cells = list(zip(*rows))
+        del rows
+        chunk = {}
+        for name, i in zip(names, index):
+            try:
+                chunk[name] = _csv_array(cells[i], schema.get(name))
+            except ValueError as e:
+                raise Exception(f"Column '{name}': {e}")
+        yield chunk
+
+def _numpy_table(chunks, names, schema=None):
+    # joins the chunks from _numpy_chunks into one array per column. Chunks are
+    # typed on their own, so a column that changed type along the way (ints then
+    # floats) is widened; numbers mixed with text end up as text.
+    schema = schema or {}
+    chunks = list(chunks)
+    table = {}
+    for name in names:
+        parts = [chunk[name] for chunk in chunks]
+        if not parts:
+            table[name] = _csv_array((), schema.get(name, str))
+            continue
+        if len({part.dtype for part in parts}) > 1 and not all(part.dtype.kind in "if" for part in parts):
+            parts = [part if part.dtype == object else part.astype(str).astype(object) for part in parts]
+        table[name] = parts[0] if len(parts) == 1 else numpy.concatenate(parts)
+        for chunk in chunks:
+            del chunk[name]  # let each column's chunks go as soon as it's joined
+    return table
+
+def _arrow_options(encoding, schema, columns, ragged="error"):
+    types = {}
+    for name, kind in (schema or {}).items():
+        kind = _PY_TYPES.get(kind, kind)
+        types[name] = kind if isinstance(kind, pyarrow.DataType) else pyarrow.type_for_alias("string" if kind in ("str", "object") else str(kind))
+    encoding = codecs.lookup(encoding or "utf-8").name
+    read = pyarrow.csv.ReadOptions(encoding="utf8" if encoding == "utf-8" else encoding)
+    convert = pyarrow.csv.ConvertOptions(column_types=types, include_columns=list(columns or []))
+    options = {"read_options": read, "convert_options": convert}
+    if ragged == "skip":
+        options["parse_options"] = pyarrow.csv.ParseOptions(invalid_row_handler=lambda row: "skip")
+    return options
+
+def _arrow_chunks(binary, encoding, chunk_size, schema=None, columns=None, ragged="error"):
+    # pyarrow Tables of chunk_size rows from a binary CSV stream. The streaming
+    # reader settles column types on its first block, so pass a schema if a
+    # column can change later on (e.g. ints first, decimals further down).
+    reader = pyarrow.csv.open_csv(binary, **_arrow_options(encoding, schema, columns, ragged))
+    pending, rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pyarrow.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pyarrow.Table.from_batches(pending)
+
+def _csv_columnar(binary, encoding="utf-8", schema=None, columns=None, backend=None, ragged="error"):
+    # the whole CSV from a binary stream as a pyarrow Table or dict of arrays
+    if _columnar_backend(backend, ragged) == "arrow":
+        return pyarrow.csv.read_csv(binary, **_arrow_options(encoding, schema, columns, ragged))
+    layout = _csv_layout(io.TextIOWrapper(binary, encoding=encoding, newline=""), columns)
+    return _numpy_table(_numpy_chunks(layout, _CHUNK_ROWS, schema, ragged), layout[2], schema)
+
+def _csv_column_chunks(binary, encoding="utf-8", chunk_size=None, schema=None, columns=None, backend=None, ragged="error"):
+    chunk_size = chunk_size or _CHUNK_ROWS
+    if _columnar_backend(backend, ragged) == "arrow":
+        yield from _arrow_chunks(binary, encoding, chunk_size, schema, columns, ragged)
+        return
+    layout = _csv_layout(io.TextIOWrapper(binary, encoding=encoding, newline=""), columns)
+    yield from _numpy_chunks(layout, chunk_size, schema, ragged)
+
+def _xml_elements(source, match):
+    # Elements matching match (a tag like "item" or a path like "channel/item",
+    # "*" matches any tag) from an XML file or stream, yielded as each one is
+    # closed. Finished elements are unhooked from their parent so the tree never
+    # grows; a yielded element stays whole for as long as you keep it.
+    want = match.strip("/").split("/")
+    depth = len(want)
+    stack, open_matches = [], 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            path = stack[-depth:]
+            hit = len(path) == depth and all(w == "*" or w == e.tag for w, e in zip(want, path))
+            if hit:
+                open_matches += 1
+            continue
+        hit = len(stack) >= depth and all(w == "*" or w == e.tag for w, e in zip(want, stack[-depth:]))
+        stack.pop()
+        if hit:
+            open_matches -= 1
+            yield elem
+        if open_matches == 0 and stack:
+            stack[-1].remove(elem)
+            if not hit:
+                elem.clear()
+
 class grabexternal:
+    # Every fetch goes through one shared requests.Session, so connections are
+    # pooled and reused between calls. Change the settings with configure().
+    timeout = 30
+    retries = 3
+    pool_size = 32
+    workers = 16
+    headers = {}
+    _session = None
+    _session_lock = threading.Lock()
+    _deadline = threading.local()  # set by aparse so a timed call can't outlive its timeout
+
+    @staticmethod
+    def configure(timeout=None, retries=None, pool_size=None, workers=None, headers=None):
+        with grabexternal._session_lock:
+            if timeout is not None:
+                grabexternal.timeout = timeout
+            if retries is not None:
+                grabexternal.retries = retries
+            if pool_size is not None:
+                grabexternal.pool_size = pool_size
+            if workers is not None:
+                grabexternal.workers = workers
+            if headers is not None:
+                grabexternal.headers = dict(headers)
+            if grabexternal._session is not None:
+                grabexternal._session.close()
+                grabexternal._session = None
+
+    @staticmethod
+    def session():
+        if grabexternal._session is None:
+            with grabexternal._session_lock:
+                if grabexternal._session is None:
+                    session = requests.Session()
+                    import urllib3
+                    retry = urllib3.util.Retry(total=grabexternal.retries, backoff_factor=0.3,
+                                               status_forcelist=(500, 502, 503, 504), raise_on_status=False)
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=grabexternal.pool_size,
+                                                            pool_maxsize=grabexternal.pool_size, max_retries=retry)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update(grabexternal.headers)
+                    grabexternal._session = session
+        return grabexternal._session
+
+    @staticmethod
+    def fetch(url, **kwargs):
+        kwargs.setdefault("timeout", grabexternal.timeout)
+        deadline = getattr(grabexternal._deadline, "at", None)
+        if deadline is not None:
+            left = deadline - _monotonic()
+            if left <= 0:
+                raise TimeoutError(f"timed out before fetching {url}")
+            kwargs["timeout"] = left if kwargs["timeout"] is None else min(kwargs["timeout"], left)
+        return grabexternal.session().get(url, **kwargs)
+
+    @staticmethod
+    def _load(url, fmt, parse_body):
+        # fetch url and parse the body with parse_body(response), going through
+        # grabexternal.cache when it's enabled
+        cache = grabexternal.cache
+        entry = cache._get(url, fmt) if cache.enabled else None
+        headers = {}
+        if entry is not None:
+            if _walltime() < entry["stored"] + cache.ttl:
+                cache.hits += 1
+                return entry["value"]
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = grabexternal.fetch(url, headers=headers) if headers else grabexternal.fetch(url)
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated += 1
+            entry["stored"] = _walltime()
+            cache._put(url, fmt, entry)
+            return entry["value"]
+        if response.status_code != 200:
+            raise Exception("Error:", response.status_code)
+        try:
+            parseddata = parse_body(response)
+        except Exception as e:
+            retEx(e)
+        if cache.enabled:
+            cache.misses += 1
+            cache._put(url, fmt, {"value": parseddata, "etag": response.headers.get("ETag"),
+                                  "last_modified": response.headers.get("Last-Modified"),
+                                  "stored": _walltime(), "size": len(response.content)})
+        return parseddata
+
+    class cache:
+        # Parsed-response cache for grabexternal.parse.json/xml/csv/yaml, keyed
+        # by URL and format. Entries are served straight from memory for ttl
+        # seconds, then revalidated with If-None-Match / If-Modified-Since so an
+        # unchanged body (304) isn't downloaded or parsed again. Least recently
+        # used entries are dropped past max_entries or max_bytes (body size). If
+        # directory is set, entries are also pickled there and survive restarts;
+        # the folder is trimmed the same way, oldest file first, past disk_bytes.
+        enabled = False
+        ttl = 60
+        max_entries = 256
+        max_bytes = 64 * 1024 * 1024
+        disk_bytes = 256 * 1024 * 1024
+        directory = None
+        hits = 0
+        misses = 0
+        revalidated = 0
+        _entries = collections.OrderedDict()
+        _bytes = 0
+        _lock = threading.Lock()
+
+        @staticmethod
+        def configure(enabled=True, ttl=None, max_entries=None, max_bytes=None, directory=None, disk_bytes=None):
+            cache = grabexternal.cache
+            with cache._lock:
+                cache.enabled = enabled
+                if ttl is not None:
+                    cache.ttl = ttl
+                if max_entries is not None:
+                    cache.max_entries = max_entries
+                if max_bytes is not None:
+                    cache.max_bytes = max_bytes
+                if disk_bytes is not None:
+                    cache.disk_bytes = disk_bytes
+                if directory is not None:
+                    os.makedirs(directory, exist_ok=True)
+                    cache.directory = directory
+                cache._evict()
+            if cache.directory:
+                cache._trim()
+
+        @staticmethod
+        def stats():
+            cache = grabexternal.cache
+            return {"hits": cache.hits, "misses": cache.misses, "revalidated": cache.revalidated,
+                    "entries": len(cache._entries), "bytes": cache._bytes}
+
+        @staticmethod
+        def clear(disk=False):
+            cache = grabexternal.cache
+            with cache._lock:
+                cache._entries.clear()
+                cache._bytes = 0
+                cache.hits = cache.misses = cache.revalidated = 0
+                if disk and cache.directory:
+                    for name in os.listdir(cache.directory):
+                        if name.endswith(".dipcache"):
+                            os.remove(os.path.join(cache.directory, name))
+
+        @staticmethod
+        def _disk_path(key):
+            digest = hashlib.sha256(f"{key[1]} {key[0]}".encode("utf-8")).hexdigest()
+            return os.path.join(grabexternal.cache.directory, digest + ".dipcache")
+
+        @staticmethod
+        def _get(url, fmt):
+            cache = grabexternal.cache
+            key = (url, fmt)
+            with cache._lock:
+                entry = cache._entries.get(key)
+                if entry is not None:
+                    cache._entries.move_to_end(key)
+                    return entry
+            if cache.directory:
+                path = cache._disk_path(key)
+                try:
+                    with open(path, "rb") as f:
+                        entry = pickle.load(f)
+                    os.utime(path)  # most recently used, for _trim
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    return None
+                with cache._lock:
+                    cache._store(key, entry)
+            return entry
+
+        @staticmethod
+        def _put(url, fmt, entry):
+            cache = grabexternal.cache
+            key = (url, fmt)
+            with cache._lock:
+                cache._store(key, entry)
+            if cache.directory:
+                path = cache._disk_path(key)
+                try:
+                    with open(path + ".tmp", "wb") as f:
+                        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(path + ".tmp", path)
+                    cache._trim()
+                except Exception:
+                    pass  # the disk copy is only a bonus, memory still has it
+
+        @staticmethod
+        def _trim():
+            # drops the least recently used files until the folder fits disk_bytes
+            cache = grabexternal.cache
+            entries = []
+            with os.scandir(cache.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".dipcache"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= cache.disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+        @staticmethod
+        def _store(key, entry):
+            cache = grabexternal.cache
+            old = cache._entries.pop(key, None)
+            if old is not None:
+                cache._bytes -= old["size"]
+            cache._entries[key] = entry
+            cache._bytes += entry["size"]
+            cache._evict()
+
+        @staticmethod
+        def _evict():
+            cache = grabexternal.cache
+            while cache._entries and (len(cache._entries) > cache.max_entries or cache._bytes > cache.max_bytes):
+                _, old = cache._entries.popitem(last=False)
+                cache._bytes -= old["size"]
 
     class parse:
 
         @staticmethod
-        def json(url):
-            response = requests.get(url)
-            if response.status_code == 200:
+        def many(urls, fmt, workers=None):
+            # fetches and parses on a thread pool; results come back in the same
+            # order as urls, with the exception in place of any URL that failed
+            if fmt not in ("json", "xml", "csv", "yaml"):
+                retEx(f"Unknown format '{fmt}', use json, xml, csv or yaml")
+            parser = getattr(grabexternal.parse, fmt)
+            urls = list(urls)
+
+            def fetch_one(url):
                 try:
-                    parseddata = json.loads(response.text)
-                    return parseddata
+                    return parser(url)
                 except Exception as e:
-                    retEx(e)
-            else:
-                raise Exception("Error:", response.status_code)
+                    return e
+
+            workers = max(1, min(workers or grabexternal.workers, len(urls)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(fetch_one, urls))
+
+        @staticmethod
+        def json(url):
+            return grabexternal._load(url, "json", lambda response: _json_loads(response.content))
 
         @staticmethod
         def xml(url):
-            response = requests.get(url)
-            if response.status_code == 200:
+            return grabexternal._load(url, "xml", lambda response: ET.fromstring(response.text))
+
+        @staticmethod
+        def iter_xml(url, match):
+            # streams the body instead of loading response.text, see _xml_elements
+            response = grabexternal.fetch(url, stream=True)
+            with response:
+                if response.status_code != 200:
+                    raise Exception("Error:", response.status_code)
                 try:
-                    parseddata = ET.fromstring(response.text)
-                    return parseddata
+                    response.raw.decode_content = True
+                    response.raw.auto_close = False
+                    yield from _xml_elements(response.raw, match)
                 except Exception as e:
                     retEx(e)
-            else:
-                raise Exception("Error:", response.status_code)
 
         @staticmethod
         def csv(url):
-            response = requests.get(url)
-            if response.status_code == 200:
+            if not grabexternal.cache.enabled:
+                return list(grabexternal.parse.iter_csv(url))
+            return grabexternal._load(url, "csv", lambda response: list(_csv_rows(io.StringIO(response.text, newline=""))))
+
+        @staticmethod
+        def iter_csv(url, chunk_size=None, columns=None, tuples=False):
+            # streams the body instead of loading response.text, see _csv_rows
+            response = grabexternal.fetch(url, stream=True)
+            with response:
+                if response.status_code != 200:
+                    raise Exception("Error:", response.status_code)
                 try:
-                    reader = csv.DictReader(io.StringIO(response.text))
-                    return [row for row in reader]
+                    response.raw.decode_content = True
+                    response.raw.auto_close = False  # TextIOWrapper reads again after the end
+                    text = io.TextIOWrapper(response.raw, encoding=response.encoding or "utf-8", newline="")
+                    yield from _csv_rows(text, chunk_size, columns, tuples)
                 except Exception as e:
                     retEx(e)
-            else:
-                raise Exception("Error:", response.status_code)
 
         @staticmethod
-        def yaml(url):
-            response = requests.get(url)
-            if response.status_code == 200:
+        def csv_columns(url, schema=None, columns=None, backend="auto", ragged="error"):
+            # typed arrays per column instead of a dict per row, see _csv_columnar.
+            # Parsed straight off the stream and never cached.
+            response = grabexternal.fetch(url, stream=True)
+            with response:
+                if response.status_code != 200:
+                    raise Exception("Error:", response.status_code)
                 try:
-                    parseddata = yaml.safe_load(response.text)
-                    return parseddata
+                    response.raw.decode_content = True
+                    response.raw.auto_close = False  # pyarrow reads again after the end
+                    return _csv_columnar(response.raw, response.encoding or "utf-8", schema, columns, backend, ragged)
                 except Exception as e:
                     retEx(e)
-            else:
-                raise Exception("Error:", response.status_code)
+
+        @staticmethod
+        def iter_csv_columns(url, chunk_size=None, schema=None, columns=None, backend="auto", ragged="error"):
+            response = grabexternal.fetch(url, stream=True)
+            with response:
+                if response.status_code != 200:
+                    raise Exception("Error:", response.status_code)
+                try:
+                    response.raw.decode_content = True
+                    response.raw.auto_close = False
+                    yield from _csv_column_chunks(response.raw, response.encoding or "utf-8", chunk_size, schema, columns, backend, ragged)
+                except Exception as e:
+                    retEx(e)
+
+        @staticmethod
+        def yaml(url):
+            return grabexternal._load(url, "yaml", lambda response: yaml.load(response.text, Loader=_yaml_backend()[0]))
+
+    class aparse:
+        # awaitable versions of grabexternal.parse for asyncio code. Each call runs
+        # the normal sync fetch + parse on a thread pool, so the event loop never
+        # blocks and results/errors match the sync functions exactly. At most
+        # `limit` run at once; timeout caps the whole call in seconds, and is
+        # also passed down to the HTTP request so the worker thread gives up too.
+        limit = 16
+        _pool = None
+        _pool_size = None
+        _pool_lock = threading.Lock()
+        _semaphores = weakref.WeakKeyDictionary()
+
+        @staticmethod
+        def _call(fn, args, deadline):
+            grabexternal._deadline.at = deadline
+            try:
+                return fn(*args)
+            finally:
+                grabexternal._deadline.at = None
+
+        @staticmethod
+        def _executor():
+            # a new pool when limit changed; the old one finishes its calls and exits
+            aparse = grabexternal.aparse
+            with aparse._pool_lock:
+                if aparse._pool is None or aparse._pool_size != aparse.limit:
+                    old = aparse._pool
+                    aparse._pool = concurrent.futures.ThreadPoolExecutor(max_workers=aparse.limit, thread_name_prefix="DIP-aparse")
+                    aparse._pool_size = aparse.limit
+                    if old is not None:
+                        old.shutdown(wait=False)
+                return aparse._pool
+
+        @staticmethod
+        async def _run(fn, *args, timeout=None):
+            aparse = grabexternal.aparse
+            loop = asyncio.get_running_loop()
+            limit, semaphore = aparse._semaphores.get(loop, (None, None))
+            if limit != aparse.limit:
+                semaphore = asyncio.Semaphore(aparse.limit)
+                aparse._semaphores[loop] = (aparse.limit, semaphore)
+            async with semaphore:
+                deadline = None if timeout is None else _monotonic() + timeout
+                future = loop.run_in_executor(aparse._executor(), aparse._call, fn, args, deadline)
+                return await asyncio.wait_for(future, timeout)
+
+        @staticmethod
+        async def json(url, timeout=None):
+            return await grabexternal.aparse._run(grabexternal.parse.json, url, timeout=timeout)
+
+        @staticmethod
+        async def xml(url, timeout=None):
+            return await grabexternal.aparse._run(grabexternal.parse.xml, url, timeout=timeout)
+
+        @staticmethod
+        async def csv(url, timeout=None):
+            return await grabexternal.aparse._run(grabexternal.parse.csv, url, timeout=timeout)
+
+        @staticmethod
+        async def yaml(url, timeout=None):
+            return await grabexternal.aparse._run(grabexternal.parse.yaml, url, timeout=timeout)
+
+        @staticmethod
+        async def many(urls, fmt, timeout=None):
+            # same as parse.many: results in order, exception in place of a failed URL
+            if fmt not in ("json", "xml", "csv", "yaml"):
+                retEx(f"Unknown format '{fmt}', use json, xml, csv or yaml")
+            parser = getattr(grabexternal.aparse, fmt)
+            return await asyncio.gather(*(parser(url, timeout=timeout) for url in urls), return_exceptions=True)
+
+_MISS = object()
+
+def _file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+_EXTENSIONS = {".json": "json", ".xml": "xml", ".csv": "csv", ".yaml": "yaml", ".yml": "yaml"}
+
+def _copy_parsed(value):
+    # quicker than copy.deepcopy for the plain dicts/lists/strings JSON, YAML
+    # and CSV give back; anything else is handed to deepcopy
+    if type(value) is dict:
+        return {k: _copy_parsed(v) for k, v in value.items()}
+    if type(value) is list:
+        return [_copy_parsed(v) for v in value]
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    return copy.deepcopy(value)
 
 class parse:
+    class cache:
+        # Opt-in memo for parse.file.json/csv/yaml/xml. A parsed file is kept
+        # against its inode, st_mtime_ns and st_size; a repeat call costs one os.stat and
+        # gets the kept object back (or a copy with copy=True) until the file
+        # changes. Least recently used files are dropped past max_entries.
+        enabled = False
+        max_entries = 128
+        hits = 0
+        misses = 0
+        _entries = collections.OrderedDict()
+        _lock = threading.Lock()
+
+        @staticmethod
+        def configure(enabled=True, max_entries=None):
+            cache = parse.cache
+            with cache._lock:
+                cache.enabled = enabled
+                if max_entries is not None:
+                    cache.max_entries = max_entries
+                while len(cache._entries) > cache.max_entries:
+                    cache._entries.popitem(last=False)
+
+        @staticmethod
+        def invalidate(filepath=None):
+            cache = parse.cache
+            with cache._lock:
+                if filepath is None:
+                    cache._entries.clear()
+                    return
+                path = os.path.abspath(filepath)
+                for key in [key for key in cache._entries if os.path.abspath(key[0]) == path]:
+                    del cache._entries[key]
+
+        @staticmethod
+        def stats():
+            cache = parse.cache
+            return {"hits": cache.hits, "misses": cache.misses, "entries": len(cache._entries)}
+
+        @staticmethod
+        def _lookup(filepath, fmt):
+            # (key, stamp, parsed): parsed is the kept object if the file hasn't
+            # changed since, else _MISS; stamp is None if the file can't be stat'ed
+            cache = parse.cache
+            key = (os.fspath(filepath), fmt)
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                return key, None, _MISS
+            stamp = (st.st_ino, st.st_dev, st.st_mtime_ns, st.st_size)
+            with cache._lock:
+                entry = cache._entries.get(key)
+                if entry is not None and entry[0] == stamp:
+                    cache._entries.move_to_end(key)
+                    cache.hits += 1
+                    return key, stamp, entry[1]
+            return key, stamp, _MISS
+
+        @staticmethod
+        def _store(key, stamp, parseddata):
+            cache = parse.cache
+            with cache._lock:
+                cache.misses += 1
+                cache._entries[key] = (stamp, parseddata)
+                cache._entries.move_to_end(key)
+                while len(cache._entries) > cache.max_entries:
+                    cache._entries.popitem(last=False)
+
+        @staticmethod
+        def load(filepath, fmt, reader, copy=False):
+            cache = parse.cache
+            if not cache.enabled:
+                return parse.snapshot.load(filepath, fmt, reader)
+            key, stamp, parseddata = cache._lookup(filepath, fmt)
+            if parseddata is _MISS:
+                parseddata = parse.snapshot.load(filepath, fmt, reader)  # with no stamp, this raises the reader's usual error
+                if stamp is not None:
+                    cache._store(key, stamp, parseddata)
+            return _copy_parsed(parseddata) if copy else parseddata
+
+    class snapshot:
+        # Opt-in on-disk companion to parse.cache, for files that are slow to
+        # parse (YAML by default). The parsed result is pickled into a
+        # __dipcache__ folder beside the source, like __pycache__, and later runs
+        # unpickle it instead of parsing. A snapshot is used while the source's
+        # size and mtime match, or its content hash still does (after a touch or a
+        # fresh checkout). Each folder is trimmed to max_bytes, least recently
+        # used first. Loading a snapshot runs pickle, so only keep them where
+        # nobody you don't trust can write.
+        enabled = False
+        formats = ("yaml",)
+        directory = "__dipcache__"
+        max_bytes = 64 * 1024 * 1024
+        hits = 0
+        misses = 0
+        _version = 1
+        _folders = set()
+        _lock = threading.Lock()
+
+        @staticmethod
+        def configure(enabled=True, formats=None, directory=None, max_bytes=None):
+            snap = parse.snapshot
+            snap.enabled = enabled
+            if formats is not None:
+                snap.formats = tuple(formats)
+            if directory is not None:
+                snap.directory = directory  # an absolute path is one shared folder for every file
+            if max_bytes is not None:
+                snap.max_bytes = max_bytes
+
+        @staticmethod
+        def invalidate(filepath=None):
+            # one file's snapshots, or everything in the folders used so far
+            snap = parse.snapshot
+            if filepath is not None:
+                paths = [snap._path(filepath, fmt)[1] for fmt in ("json", "xml", "csv", "yaml")]
+            else:
+                paths = [os.path.join(folder, name) for folder in list(snap._folders) if os.path.isdir(folder)
+                         for name in os.listdir(folder) if name.endswith(".snap")]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+        @staticmethod
+        def stats():
+            snap = parse.snapshot
+            return {"hits": snap.hits, "misses": snap.misses}
+
+        @staticmethod
+        def load(filepath, fmt, reader):
+            snap = parse.snapshot
+            if not snap.enabled or fmt not in snap.formats:
+                return reader(filepath)
+            stamp, parseddata = snap._read(filepath, fmt)
+            if parseddata is _MISS:
+                parseddata = reader(filepath)
+                if stamp is not None:
+                    snap._write(filepath, fmt, stamp, parseddata)
+            return parseddata
+
+        @staticmethod
+        def _path(filepath, fmt):
+            source = os.path.abspath(filepath)
+            folder = os.path.join(os.path.dirname(source), parse.snapshot.directory)
+            tag = hashlib.blake2b(source.encode("utf-8", "surrogateescape"), digest_size=6).hexdigest()
+            return folder, os.path.join(folder, f"{os.path.basename(source)}.{tag}.{fmt}.snap")
+
+        @staticmethod
+        def _read(filepath, fmt):
+            # (stamp, parsed): parsed is _MISS unless there's a valid snapshot;
+            # stamp is None if the source can't be stat'ed
+            snap = parse.snapshot
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                return None, _MISS
+            stamp = (st.st_mtime_ns, st.st_size)
+            path = snap._path(filepath, fmt)[1]
+            try:
+                with open(path, "rb") as f:
+                    version, kind, size, mtime, digest = pickle.load(f)
+                    valid = (version, kind, size) == (snap._version, fmt, st.st_size)
+                    touched = valid and mtime != st.st_mtime_ns
+                    if touched:
+                        valid = digest == _file_digest(filepath)
+                    if valid:
+                        parseddata = pickle.load(f)
+            except FileNotFoundError:
+                valid = False
+            except Exception:
+                valid = False  # torn or from an older version; rewritten below
+            with snap._lock:
+                if valid:
+                    snap.hits += 1
+                else:
+                    snap.misses += 1
+            if not valid:
+                return stamp, _MISS
+            if touched:
+                snap._write(filepath, fmt, stamp, parseddata)  # same content, new mtime
+            else:
+                try:
+                    os.utime(path)  # most recently used, for _trim
+                except OSError:
+                    pass
+            return stamp, parseddata
+
+        @staticmethod
+        def _write(filepath, fmt, stamp, parseddata):
+            # best effort: a read-only folder or an unpicklable result just means
+            # no snapshot, and a source that changed while it was parsed is skipped
+            snap = parse.snapshot
+            folder, path = snap._path(filepath, fmt)
+            try:
+                digest = _file_digest(filepath)
+                st = os.stat(filepath)
+                if (st.st_mtime_ns, st.st_size) != stamp:
+                    return
+                data = pickle.dumps(parseddata, protocol=5)
+                if len(data) > snap.max_bytes:
+                    return
+                os.makedirs(folder, exist_ok=True)
+                snap._folders.add(folder)
+                with _writing(path, binary=True, atomic=True) as f:
+                    pickle.dump((snap._version, fmt, st.st_size, st.st_mtime_ns, digest), f, protocol=5)
+                    f.write(data)
+                snap._trim(folder)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError, RecursionError):
+                pass
+
+        @staticmethod
+        def _trim(folder):
+            # drops the least recently used snapshots until the folder fits max_bytes
+            entries = []
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.name.endswith(".snap"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime_ns, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= parse.snapshot.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
     class file:
+        # many() settings: how many files at once (None means one per CPU), and
+        # the formats parsed in Python code, which go to a process pool so they
+        # can use every core. JSON's C parser is quick enough that sending the
+        # result back from another process would cost more than it saves, so it
+        # stays on threads.
+        workers = None
+        process_formats = ("yaml", "xml", "csv")
+
+        @staticmethod
+        def many(paths, fmt=None, workers=None, pool="auto", stream=False, copy=False):
+            # paths is a list of files or a glob pattern ("configs/**/*.yaml"); the
+            # format comes from each file's extension unless fmt is given, and
+            # pool="process"/"thread" puts every file on one kind of pool. Returns
+            # {path: parsed} in the order given, with the exception in place of
+            # any file that failed; stream=True yields (path, parsed) pairs as
+            # files finish instead. Goes through parse.cache and parse.snapshot
+            # like the single-file functions.
+            if pool not in ("auto", "process", "thread"):
+                retEx(f"Unknown pool '{pool}', use auto, process or thread")
+            if fmt is not None and fmt not in ("json", "xml", "csv", "yaml"):
+                retEx(f"Unknown format '{fmt}', use json, xml, csv or yaml")
+            if isinstance(paths, (str, os.PathLike)):
+                paths = sorted(path for path in glob.glob(os.fspath(paths), recursive=True) if not os.path.isdir(path))
+            paths = list(dict.fromkeys(paths))
+            finished = parse.file._many(paths, fmt, workers, pool, copy)
+            if stream:
+                return finished
+            results = dict.fromkeys(paths)
+            for path, parseddata in finished:
+                results[path] = parseddata
+            return results
+
+        @staticmethod
+        def _many(paths, fmt, workers, pool, copy):
+            cache, snapshot = parse.cache, parse.snapshot
+            jobs = {"process": [], "thread": []}
+            for path in paths:
+                kind = fmt or _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+                if kind not in ("json", "xml", "csv", "yaml"):
+                    yield path, Exception(f"Unknown format for '{path}', use json, xml, csv or yaml")
+                    continue
+                key = stamp = snap_stamp = None
+                if cache.enabled:
+                    key, stamp, parseddata = cache._lookup(path, kind)
+                    if parseddata is not _MISS:
+                        yield path, _copy_parsed(parseddata) if copy else parseddata
+                        continue
+                if snapshot.enabled and kind in snapshot.formats:
+                    # snapshots are read and written here, so workers need none of the settings
+                    snap_stamp, parseddata = snapshot._read(path, kind)
+                    if parseddata is not _MISS:
+                        if stamp is not None:
+                            cache._store(key, stamp, parseddata)
+                            if copy:
+                                parseddata = _copy_parsed(parseddata)
+                        yield path, parseddata
+                        continue
+                if pool == "auto":
+                    where = "process" if kind in parse.file.process_formats and (os.cpu_count() or 1) > 1 else "thread"
+                else:
+                    where = pool
+                jobs[where].append((path, kind, key, stamp, snap_stamp))
+            if pool == "auto" and len(jobs["process"]) == 1:
+                jobs["thread"] += jobs.pop("process")  # not worth starting a process for
+            workers = workers or parse.file.workers or os.cpu_count() or 1
+            futures = {}
+            with contextlib.ExitStack() as stack:
+                for where, batch in jobs.items():
+                    if not batch:
+                        continue
+                    executor = concurrent.futures.ProcessPoolExecutor if where == "process" else concurrent.futures.ThreadPoolExecutor
+                    executor = stack.enter_context(executor(max_workers=min(workers, len(batch))))
+                    for path, kind, key, stamp, snap_stamp in batch:
+                        futures[executor.submit(getattr(parse.file, "_" + kind), path)] = (path, kind, key, stamp, snap_stamp)
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        path, kind, key, stamp, snap_stamp = futures[future]
+                        try:
+                            parseddata = future.result()
+                        except Exception as e:
+                            yield path, e
+                            continue
+                        if snap_stamp is not None:
+                            snapshot._write(path, kind, snap_stamp, parseddata)
+                        if stamp is not None:
+                            cache._store(key, stamp, parseddata)
+                            if copy:
+                                parseddata = _copy_parsed(parseddata)
+                        yield path, parseddata
+                finally:
+                    for future in futures:
+                        future.cancel()  # the caller stopped early, don't parse the rest
+
+        @staticmethod
+        def json(filepath, copy=False):
+            return parse.cache.load(filepath, "json", parse.file._json, copy)
+
+        @staticmethod
+        def csv(filepath, copy=False):
+            return parse.cache.load(filepath, "csv", parse.file._csv, copy)
+
+        @staticmethod
+        def yaml(filepath, copy=False):
+            return parse.cache.load(filepath, "yaml", parse.file._yaml, copy)
+
         @staticmethod
-        def json(filepath):
+        def xml(filepath, copy=False):
+            return parse.cache.load(filepath, "xml", parse.file._xml, copy)
+
+        @staticmethod
+        def _json(filepath):
             try:
-                with open(filepath, "r", encoding="utf-8") as file:
-                    parseddata = json.load(file)
+                with open(filepath, "rb") as file:
+                    parseddata = _json_loads(file.read())
                     return parseddata
             except FileNotFoundError:
                 raise Exception(f"File '{filepath}' not found.")
@@ -291,7 +1863,7 @@ class parse:
                 #Nick, stop complaining and get back to work
 
         @staticmethod
-        def csv(filepath):
+        def _csv(filepath):
             try:
                 with open(filepath, "r", encoding="utf-8") as file:
                     reader = csv.DictReader(file)
@@ -304,10 +1876,48 @@ class parse:
                 retEx(e)
 
         @staticmethod
-        def yaml(filepath):
+        def iter_csv(filepath, chunk_size=None, columns=None, tuples=False):
+            try:
+                with open(filepath, "r", encoding="utf-8", newline="") as file:
+                    yield from _csv_rows(file, chunk_size, columns, tuples)
+            except FileNotFoundError:
+                raise Exception(f"File '{filepath}' not found.")
+            except csv.Error as e:
+                raise Exception("csv error yoo! ", e)
+            except Exception as e:
+                retEx(e)
+
+        @staticmethod
+        def csv_columns(filepath, schema=None, columns=None, backend="auto", ragged="error"):
+            # typed arrays per column instead of a dict per row, see _csv_columnar.
+            # Not kept by parse.cache.
+            try:
+                with open(filepath, "rb") as file:
+                    return _csv_columnar(file, "utf-8", schema, columns, backend, ragged)
+            except FileNotFoundError:
+                raise Exception(f"File '{filepath}' not found.")
+            except csv.Error as e:
+                raise Exception("csv error yoo! ", e)
+            except Exception as e:
+                retEx(e)
+
+        @staticmethod
+        def iter_csv_columns(filepath, chunk_size=None, schema=None, columns=None, backend="auto", ragged="error"):
+            try:
+                with open(filepath, "rb") as file:
+                    yield from _csv_column_chunks(file, "utf-8", chunk_size, schema, columns, backend, ragged)
+            except FileNotFoundError:
+                raise Exception(f"File '{filepath}' not found.")
+            except csv.Error as e:
+                raise Exception("csv error yoo! ", e)
+            except Exception as e:
+                retEx(e)
+
+        @staticmethod
+        def _yaml(filepath):
             try:
                 with open(filepath, "r", encoding="utf-8") as file:
-                    parseddata = yaml.safe_load(file)
+                    parseddata = yaml.load(file, Loader=_yaml_backend()[0])
                     return parseddata
             except FileNotFoundError:
                 raise Exception(f"File '{filepath}' not found.")
@@ -317,11 +1927,10 @@ class parse:
                 retEx(e)
 
         @staticmethod
-        def xml(filepath):
+        def _xml(filepath):
             try:
-                with open(filepath, "r", encoding="utf-8") as file:
-                    content = file.read()
-                    parseddata = ET.fromstring(content)
+                with open(filepath, "rb") as file:
+                    parseddata = ET.parse(file).getroot()
                     return parseddata
             except FileNotFoundError:
                 raise Exception(f"File '{filepath}' not found.")
@@ -330,7 +1939,28 @@ class parse:
             except Exception as e:
                 retEx(e)
 
+        @staticmethod
+        def iter_xml(filepath, match):
+            try:
+                with open(filepath, "rb") as file:
+                    yield from _xml_elements(file, match)
+            except FileNotFoundError:
+                raise Exception(f"File '{filepath}' not found.")
+            except ET.ParseError as e:
+                raise Exception("Invalid XML in file:", e)
+            except Exception as e:
+                retEx(e)
+
 class internet:
+    _client = None
+
+    @staticmethod
+    def client():
+        # made on first use so importing System doesn't load freecurrencyapi
+        if internet._client is None:
+            internet._client = freecurrencyapi.Client('fca_live_Wka6rbO1pD7fslnGeLLxUkhczd94oC0BfGzIK7fL')
+        return internet._client
+
     @staticmethod
     def extract_domain(url):
         try:
@@ -338,8 +1968,123 @@ class internet:
 
         except Exception as e:
             retEx(e)
+    class rates:
+        # Exchange rate table against one base currency (what freecurrencyapi's
+        # latest() returns: units of each currency per 1 base). It's fetched at
+        # most once per ttl seconds and any pair is worked out from it, so a
+        # whole ledger costs one API call. When the table is stale, the first
+        # caller refreshes it and callers arriving meanwhile wait for that same
+        # refresh instead of making their own. A failed refresh keeps the old
+        # table (if any) and isn't retried for retry_after seconds.
+        # snapshot: a JSON file to read rates from instead of the API, for tests
+        # and machines without internet; save() writes one.
+        ttl = 3600
+        retry_after = 60
+        snapshot = None
+        fetches = 0
+        _table = None  # {"base": "USD", "timestamp": ..., "rates": {"EUR": 0.92, ...}}
+        _loaded = None
+        _failed = None
+        _error = None
+        _refresh = None  # Future of the refresh in progress
+        _lock = threading.Lock()
+
+        @staticmethod
+        def configure(ttl=None, retry_after=None, snapshot=None):
+            rates = internet.rates
+            with rates._lock:
+                if ttl is not None:
+                    rates.ttl = ttl
+                if retry_after is not None:
+                    rates.retry_after = retry_after
+                if snapshot is not None:
+                    rates.snapshot = snapshot or None  # "" goes back to the API
+                rates._table = rates._loaded = rates._failed = rates._error = None
+
+        @staticmethod
+        def table():
+            rates = internet.rates
+            now = _monotonic()
+            table = rates._table
+            if table is not None and now - rates._loaded < rates.ttl:
+                return table
+            with rates._lock:
+                if rates._failed is not None and now - rates._failed < rates.retry_after:
+                    if rates._table is not None:
+                        return rates._table
+                    retEx(rates._error)
+                future, leader = rates._refresh, False
+                if future is None:
+                    future = rates._refresh = concurrent.futures.Future()
+                    leader = True
+            if leader:
+                try:
+                    table = rates._fetch()
+                    with rates._lock:
+                        rates._table, rates._loaded, rates._failed = table, _monotonic(), None
+                    future.set_result(table)
+                except Exception as e:
+                    with rates._lock:
+                        rates._failed, rates._error = _monotonic(), e
+                        table = rates._table
+                    if table is not None:
+                        future.set_result(table)
+                    else:
+                        future.set_exception(e)
+                finally:
+                    with rates._lock:
+                        rates._refresh = None
+            try:
+                return future.result()
+            except Exception as e:
+                retEx(e)
+
+        @staticmethod
+        def _fetch():
+            rates = internet.rates
+            if rates.snapshot:
+                with open(rates.snapshot, "rb") as f:
+                    data = _json_loads(f.read())
+            else:
+                data = internet.client().latest()
+                rates.fetches += 1
+            if "rates" not in data:  # a saved latest() response
+                data = {"base": "USD", "timestamp": _walltime(), "rates": data.get("data", {})}
+            table = {"base": data["base"].upper(), "timestamp": data.get("timestamp"),
+                     "rates": {code.upper(): float(rate) for code, rate in data["rates"].items()}}
+            table["rates"][table["base"]] = 1.0
+            return table
+
+        @staticmethod
+        def rate(src, dst):
+            # how many dst one src buys
+            table = internet.rates.table()["rates"]
+            try:
+                return table[dst.upper()] / table[src.upper()]
+            except KeyError as e:
+                retEx(f"unknown currency {e.args[0]}")
+
+        @staticmethod
+        def save(path):
+            table = internet.rates.table()
+            with open(path, "wb") as f:
+                _json_dump(table, f)
+
     @staticmethod
     def convert_currency(amount, origional_currency, converted_currency):
-        result = client.latest()
-        result = result.get('data', {}).get(converted_currency.upper)
-        return float(amount) * float(result)
+        try:
+            return float(amount) * internet.rates.rate(origional_currency, converted_currency)
+        except Exception as e:
+            retEx(e)
+
+    @staticmethod
+    def convert_many(amounts, src, dst):
+        # one rate lookup for the lot; a NumPy array (or anything else with a
+        # dtype, like a pandas Series) is multiplied in one go and stays an array
+        try:
+            rate = internet.rates.rate(src, dst)
+            if hasattr(amounts, "dtype"):
+                return amounts * rate
+            return [float(amount) * rate for amount in amounts]
+        except Exception as e:
+            retEx(e)
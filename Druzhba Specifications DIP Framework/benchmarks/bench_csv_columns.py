@@ -0,0 +1,46 @@
+# Loading a numeric CSV: parse.file.csv (a dict of strings per row) vs
+# csv_columns with the NumPy and the pyarrow backends. Prints load time and the
+# memory the result holds on to. Needs numpy; pyarrow is used if installed.
+# Run from this folder: python bench_csv_columns.py [rows]
+import os, sys, tempfile, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+
+
+def measure(name, load):
+    # timed on its own, then loaded again under tracemalloc (which slows every
+    # allocation down) to see how much memory the result holds on to
+    start = time.perf_counter()
+    load()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    result = load()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    if hasattr(result, "nbytes"):  # pyarrow allocates outside tracemalloc's view
+        held += result.nbytes
+    print(f"{name:<22} {seconds:8.3f} s {held / 1e6:10.1f} MB")
+    return result
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "sales.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,store,amount,quantity,refunded\n")
+        for i in range(ROWS):
+            f.write(f"{i},{i % 97},{i * 0.37:.2f},{i % 12},{'true' if i % 50 == 0 else 'false'}\n")
+    print(f"{ROWS} rows, {os.path.getsize(path) / 1e6:.1f} MB on disk")
+
+    rows = measure("csv (list of dicts)", lambda: System.parse.file.csv(path))
+    del rows
+    columns = measure("csv_columns numpy", lambda: System.parse.file.csv_columns(path, backend="numpy"))
+    print("  types:", {name: str(array.dtype) for name, array in columns.items()})
+    del columns
+    try:
+        table = measure("csv_columns arrow", lambda: System.parse.file.csv_columns(path, backend="arrow"))
+        del table
+    except Exception:
+        print("csv_columns arrow      pyarrow not installed")
@@ -0,0 +1,58 @@
+# Converting a ledger of amounts between currencies: convert_currency per row
+# vs convert_many, against an offline rates snapshot so no API key or network
+# is needed. Also checks that 32 threads hitting a stale table trigger only one
+# refresh. Run from this folder: python bench_currency.py [rows]
+import json, os, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+rates = System.internet.rates
+
+with tempfile.TemporaryDirectory() as tmp:
+    snapshot = os.path.join(tmp, "rates.json")
+    with open(snapshot, "w") as f:
+        json.dump({"base": "USD", "rates": {"USD": 1, "EUR": 0.92, "GBP": 0.79, "JPY": 151.2}}, f)
+
+    # count table loads by wrapping the snapshot reader
+    loads = [0]
+    fetch = rates._fetch
+    def counting_fetch():
+        loads[0] += 1
+        time.sleep(0.05)  # stand-in for API latency
+        return fetch()
+    rates._fetch = staticmethod(counting_fetch)
+
+    rates.configure(snapshot=snapshot, ttl=3600)
+    ledger = [i * 0.01 for i in range(ROWS)]
+    print(f"{ROWS} rows EUR -> JPY")
+
+    start = time.perf_counter()
+    per_row = [System.internet.convert_currency(amount, "EUR", "JPY") for amount in ledger]
+    print(f"convert_currency per row {time.perf_counter() - start:8.3f} s   table loads {loads[0]}")
+
+    start = time.perf_counter()
+    batch = System.internet.convert_many(ledger, "EUR", "JPY")
+    print(f"convert_many (list)      {time.perf_counter() - start:8.3f} s")
+    assert batch == per_row
+
+    try:
+        import numpy
+        array = numpy.array(ledger)
+        start = time.perf_counter()
+        System.internet.convert_many(array, "EUR", "JPY")
+        print(f"convert_many (NumPy)     {time.perf_counter() - start:8.3f} s")
+    except ImportError:
+        print("convert_many (NumPy)     numpy not installed")
+
+    # stale table, many callers at once: they should share one refresh
+    rates.configure(ttl=0)
+    loads[0] = 0
+    threads = [threading.Thread(target=System.internet.convert_currency, args=(1, "USD", "GBP")) for _ in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"32 concurrent callers, stale table: {loads[0]} load(s) (ttl=0 means each new wave reloads)")
+    rates._fetch = staticmethod(fetch)
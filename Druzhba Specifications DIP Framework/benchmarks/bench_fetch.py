@@ -0,0 +1,55 @@
+# Fetch-and-parse throughput for grabexternal.parse against a local
+# http.server stand-in: bare requests.get per URL (the old way), the shared
+# pooled session one URL at a time, and grabexternal.parse.many.
+# Run from this folder: python bench_fetch.py [urls]
+import json, os, sys, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import requests, System
+
+URLS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+BODY = json.dumps({"items": [{"id": i, "name": f"item {i}"} for i in range(50)]}).encode()
+DELAY = 0.005  # pretend each endpoint takes a few ms to answer
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without TCP_NODELAY every
+    # reused keep-alive connection waits on a delayed ACK, which would make the
+    # pooled session look slower than a fresh connection per request
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # default backlog of 5 drops concurrent connects
+
+
+server = Server(("localhost", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+urls = [f"http://localhost:{server.server_port}/endpoint/{i}" for i in range(URLS)]
+
+
+def run(name, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} {URLS / elapsed:>10,.0f} urls/sec ({elapsed:.3f}s)")
+
+
+run("bare get", lambda: [json.loads(requests.get(url).text) for url in urls])
+run("pooled session", lambda: [System.grabexternal.parse.json(url) for url in urls])
+run("parse.many", lambda: System.grabexternal.parse.many(urls, "json"))
+server.shutdown()
@@ -0,0 +1,38 @@
+# Import time of System, measured with `python -X importtime` in a fresh
+# interpreter. Fails (exit 1) if a heavy optional dependency gets imported
+# eagerly again, or if importing takes longer than --max-ms.
+# Run from this folder: python bench_import.py [--runs N] [--max-ms MS]
+import argparse, os, re, subprocess, sys
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LAZY = ("requests", "yaml", "psutil", "vlc", "freecurrencyapi", "playsound3", "plyer", "asyncio", "concurrent.futures", "numpy", "pyarrow")
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--runs", type=int, default=5)
+parser.add_argument("--max-ms", type=float, default=None)
+args = parser.parse_args()
+
+totals = []
+for _ in range(args.runs):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import System"],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    rows = re.findall(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", result.stderr)
+    system = [int(cumulative) for _, cumulative, _, name in rows if name == "System"]
+    totals.append(system[-1] / 1000)
+    loaded = {name for _, _, _, name in rows}
+
+slowest = sorted(((int(cumulative), name) for _, cumulative, indent, name in rows if len(indent) == 3), reverse=True)[:8]
+print(f"import System: best {min(totals):.1f} ms, median {sorted(totals)[len(totals) // 2]:.1f} ms over {args.runs} runs")
+print("slowest direct imports (last run):")
+for cumulative, name in slowest:
+    print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+failed = False
+eager = [name for name in LAZY if name in loaded]
+if eager:
+    print(f"FAIL: imported eagerly, should load on first use: {', '.join(eager)}")
+    failed = True
+if args.max_ms is not None and min(totals) > args.max_ms:
+    print(f"FAIL: import took {min(totals):.1f} ms, budget is {args.max_ms} ms")
+    failed = True
+sys.exit(1 if failed else 0)
@@ -0,0 +1,37 @@
+# Parse/serialize throughput (MB/s) for each JSON backend that is installed
+# (stdlib json, ujson, orjson), using the same helpers System's JSON functions
+# use. Run from this folder: python bench_json.py [records]
+import gc, io, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+doc = {"rows": [{"id": i, "name": f"row {i}", "price": i * 0.25, "tags": ["a", "b", "c"], "ok": i % 2 == 0}
+                for i in range(RECORDS)]}
+installed = {"orjson": System.orjson, "ujson": System.ujson}
+print(f"{RECORDS} records, System uses {System.JSON_BACKEND}")
+
+for name in ("json", "ujson", "orjson"):
+    if name != "json" and installed[name] is None:
+        print(f"{name:<8} not installed")
+        continue
+    # point the helpers at just this backend for the run
+    saved = System.orjson, System.ujson
+    System.orjson = installed["orjson"] if name == "orjson" else None
+    System.ujson = installed["ujson"] if name == "ujson" else None
+    out = io.BytesIO()
+    gc.collect()
+    gc.disable()  # cyclic GC passes triggered by allocation would swamp the parser times
+    start = time.perf_counter()
+    System._json_dump(doc, out)
+    dump_time = time.perf_counter() - start
+    data = out.getvalue()
+    start = time.perf_counter()
+    loaded = System._json_loads(data)
+    load_time = time.perf_counter() - start
+    gc.enable()
+    assert loaded == doc
+    System.orjson, System.ujson = saved
+    mb = len(data) / 1e6
+    print(f"{name:<8} parse {mb / load_time:8.1f} MB/s   write {mb / dump_time:8.1f} MB/s   ({mb:.1f} MB)")
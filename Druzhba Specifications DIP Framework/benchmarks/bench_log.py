@@ -0,0 +1,39 @@
+# Lines/sec for System.log: the old open/append/close-per-line writer against
+# the Logger in sync mode and in the default buffered (background thread) mode.
+# Run from this folder: python bench_log.py [lines]
+import datetime, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+LINES = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+
+def legacy_log(log_dir, log):
+    log_file = os.path.join(log_dir, "log.txt")
+    os.makedirs(log_dir, exist_ok=True)
+    if os.path.exists(log_file):
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"{datetime.datetime.now()} || {log}\n")
+    else:
+        with open(log_file, "w", encoding="utf-8") as f:
+            f.write(f'DIP LOG v{System.DIP_FRAMEWORK_VERSION} \nLog created {datetime.datetime.now()} \n')
+            f.write(f"{datetime.datetime.now()} || {log}\n")
+
+
+def run(name, write, finish=None):
+    start = time.perf_counter()
+    for i in range(LINES):
+        write(f"benchmark line {i}")
+    if finish:
+        finish()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {LINES / elapsed:>12,.0f} lines/sec ({elapsed:.3f}s)")
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    run("legacy", lambda line: legacy_log(os.path.join(tmp, "legacy"), line))
+    sync_logger = System.Logger(log_dir=os.path.join(tmp, "sync"), sync=True)
+    run("sync", sync_logger.write, sync_logger.close)
+    async_logger = System.Logger(log_dir=os.path.join(tmp, "async"))
+    run("buffered", async_logger.write, async_logger.close)
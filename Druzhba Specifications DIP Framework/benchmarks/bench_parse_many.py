@@ -0,0 +1,40 @@
+# Parsing a folder of config files: one parse.file.yaml call after another vs
+# parse.file.many on threads and on 1, 2, 4 ... CPU-count processes. YAML and
+# XML are parsed in Python, so only processes get past the one-core limit.
+# Run from this folder: python bench_parse_many.py [files]
+import glob, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+FILES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def timed(name, run, baseline=None):
+    start = time.perf_counter()
+    results = run()
+    seconds = time.perf_counter() - start
+    assert not any(isinstance(r, Exception) for r in results), "a file failed to parse"
+    speedup = f"  x{baseline / seconds:.1f}" if baseline else ""
+    print(f"{name:<22} {seconds:8.3f} s{speedup}")
+    return seconds
+
+
+if __name__ == "__main__":  # process pools re-import this file on Windows/macOS
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(FILES):
+            with open(os.path.join(tmp, f"service{i}.yaml"), "w", encoding="utf-8") as f:
+                for j in range(150):
+                    f.write(f"route{j}:\n  path: /api/v{i}/items/{j}\n  methods: [GET, POST]\n  timeout: {j * 0.5}\n  retries: {j % 4}\n")
+        paths = glob.glob(os.path.join(tmp, "*.yaml"))
+        cores = os.cpu_count() or 1
+        print(f"{FILES} YAML files, {cores} CPU(s)")
+
+        base = timed("one at a time", lambda: [System.parse.file.yaml(p) for p in paths])
+        timed("many, threads", lambda: list(System.parse.file.many(paths, pool="thread").values()), base)
+        workers = 1
+        while True:
+            timed(f"many, {workers} process(es)", lambda: list(System.parse.file.many(paths, workers=workers, pool="process").values()), base)
+            if workers >= cores:
+                break
+            workers = min(workers * 2, cores)
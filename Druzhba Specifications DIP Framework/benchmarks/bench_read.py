@@ -0,0 +1,51 @@
+# Read throughput (MB/s) of the computer.file.read functions on one big file:
+# whole file, chunks, mmap and readinto into one reused buffer. The file is
+# read once first so every run comes from the OS page cache.
+# Run from this folder: python bench_read.py [megabytes]
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+MB = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+read = System.computer.file.read
+
+
+def whole():
+    return len(read.read_file(path, binary=True))
+
+
+def chunks():
+    return sum(len(chunk) for chunk in read.iter_chunks(path))
+
+
+def mapped():
+    view = read.read_file(path, mmap=True)
+    # touch one byte per page so the whole file is really read
+    return sum(view[i] for i in range(0, len(view), 4096)) and len(view)
+
+
+def into():
+    buffer = bytearray(read.chunk_size)
+    total = offset = 0
+    while True:
+        n = read.readinto(path, buffer, offset)
+        total += n
+        offset += n
+        if n < len(buffer):
+            return total
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "big.bin")
+    with open(path, "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(MB):
+            f.write(block)
+    whole()
+    print(f"{MB} MB file")
+    for name, run in (("read_file", whole), ("iter_chunks", chunks), ("mmap", mapped), ("readinto", into)):
+        start = time.perf_counter()
+        size = run()
+        seconds = time.perf_counter() - start
+        print(f"{name:<12} {size / seconds / 1e6:10,.0f} MB/s")
@@ -0,0 +1,157 @@
+# Load test for REHH. Starts REHH once per mode from a generated XML config
+# (in its own process), hammers it with keep-alive HTTP clients spread over
+# several processes, and reports requests/sec and latency percentiles.
+# Run from this folder: python bench_rehh.py [--modes single,threaded,asyncio] [--seconds 5]
+# or point it at a server that's already running: python bench_rehh.py --url http://localhost:6767/
+# --scaling runs the asyncio engine with <processes> 1, 2, 4, ... up to the
+# core count and prints the speedup at each step (the clients need CPU too, so
+# give them --procs to match or run them from another machine with --url).
+import argparse, http.client, multiprocessing, os, socket, subprocess, sys, tempfile, threading, time, urllib.parse
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# extra XML tags for each mode, on top of <port>/<loc>/<html>
+MODES = {
+    "single": "",
+    "threaded": "<workers>32</workers><keepalive>5</keepalive><maxconnections>256</maxconnections>",
+    "asyncio": "<engine>asyncio</engine><keepalive>5</keepalive>",
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def start_server(tmp, mode, port, extra=""):
+    page = os.path.join(tmp, "index.html")
+    if not os.path.exists(page):
+        with open(page, "w") as f:
+            f.write("<html><body>" + "<p>REHH benchmark page</p>" * 400 + "</body></html>")
+    config = os.path.join(tmp, f"{mode}.xml")
+    with open(config, "w") as f:
+        f.write(f"<rehh><port>{port}</port><loc>diffloc</loc><html>{page}</html>{MODES[mode]}{extra}</rehh>")
+    server = subprocess.Popen([sys.executable, "-c", f"import REHH; REHH.start_rehh({config!r})"],
+                              cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("localhost", port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError(f"REHH ({mode}) did not start on port {port}")
+
+
+def client_process(url, clients, seconds, keepalive, results):
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    latencies, errors = [], [0]
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        conn = None
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+                conn.request("GET", path, headers={} if keepalive else {"Connection": "close"})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[0] += 1
+                if not keepalive or response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                errors[0] += 1
+                if conn is not None:
+                    conn.close()
+                conn = None
+                continue
+            latencies.append(time.perf_counter() - start)
+        if conn is not None:
+            conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put((latencies, errors[0]))
+
+
+def load(url, procs, clients, seconds, keepalive):
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=client_process, args=(url, clients, seconds, keepalive, results))
+               for _ in range(procs)]
+    for w in workers:
+        w.start()
+    latencies, errors = [], 0
+    for _ in workers:
+        lat, err = results.get()
+        latencies.extend(lat)
+        errors += err
+    for w in workers:
+        w.join()
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+    return len(latencies) / seconds, pct(0.5), pct(0.99), errors
+
+
+def report(name, stats):
+    rps, p50, p99, errors = stats
+    print(f"{name:<12} {rps:>10,.0f} req/s   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   errors {errors}")
+
+
+def scaling(args, keepalive):
+    cores = os.cpu_count() or 1
+    counts = sorted({min(2 ** i, cores) for i in range(cores.bit_length() + 1)})
+    print(f"{cores} cores")
+    base = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in counts:
+            port = free_port()
+            server = start_server(tmp, "asyncio", port, f"<processes>{n}</processes><reload>0</reload>")
+            try:
+                stats = load(f"http://localhost:{port}/", args.procs, args.clients, args.seconds, keepalive)
+            finally:
+                server.terminate()
+                server.wait()
+            base = base or stats[0]
+            report(f"{n} process{'es' if n > 1 else ''}", stats)
+            print(f"{'':<12} speedup x{stats[0] / base:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--url", help="benchmark an already running server instead")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--procs", type=int, default=2, help="client processes")
+    parser.add_argument("--clients", type=int, default=16, help="client threads per process")
+    parser.add_argument("--no-keepalive", action="store_true")
+    parser.add_argument("--scaling", action="store_true", help="throughput for <processes> 1..cores")
+    args = parser.parse_args()
+    keepalive = not args.no_keepalive
+    print(f"{args.procs * args.clients} clients, {args.seconds:g}s each, keep-alive {'on' if keepalive else 'off'}")
+    if args.url:
+        report("server", load(args.url, args.procs, args.clients, args.seconds, keepalive))
+        sys.exit(0)
+    if args.scaling:
+        scaling(args, keepalive)
+        sys.exit(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes.split(","):
+            port = free_port()
+            server = start_server(tmp, mode, port)
+            try:
+                report(mode, load(f"http://localhost:{port}/", args.procs, args.clients, args.seconds, keepalive))
+            finally:
+                server.terminate()
+                server.wait()
@@ -0,0 +1,48 @@
+# Startup cost of a big config file with and without parse.snapshot: a plain
+# parse, the first (cold) load that parses and writes the snapshot, and warm
+# loads from the snapshot like every later run. XML is included to show it is
+# not worth it there: expat parses faster than pickle rebuilds the elements.
+# Run from this folder: python bench_snapshot.py [entries]
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+ENTRIES = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+snapshot = System.parse.snapshot
+
+
+def timed(load, path, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        load(path)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best * 1000
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    yaml_path = os.path.join(tmp, "routes.yaml")
+    with open(yaml_path, "w", encoding="utf-8") as f:
+        for i in range(ENTRIES):
+            f.write(f"route{i}:\n  path: /api/items/{i}\n  methods: [GET, POST]\n  timeout: {i * 0.5}\n  tags: {{team: core, tier: {i % 3}}}\n")
+    xml_path = os.path.join(tmp, "routes.xml")
+    with open(xml_path, "w", encoding="utf-8") as f:
+        f.write("<routes>")
+        for i in range(ENTRIES * 4):
+            f.write(f'<route id="{i}"><path>/api/items/{i}</path><timeout>{i * 0.5}</timeout><method>GET</method></route>')
+        f.write("</routes>")
+
+    print(f"{'':<6} {'size':>9} {'parse':>10} {'cold':>10} {'warm':>10}")
+    for name, load, path in (("yaml", System.parse.file.yaml, yaml_path), ("xml", System.parse.file.xml, xml_path)):
+        snapshot.configure(False)
+        plain = timed(load, path)
+        snapshot.configure(formats=("yaml", "xml"))
+        start = time.perf_counter()
+        load(path)
+        cold = (time.perf_counter() - start) * 1000
+        warm = timed(load, path)
+        size = os.path.getsize(path) / 1e6
+        print(f"{name:<6} {size:7.1f}MB {plain:8.1f}ms {cold:8.1f}ms {warm:8.1f}ms")
+    snapshot.configure(False)
@@ -0,0 +1,28 @@
+# Back-to-back video playback, like a kiosk loop: plays a short clip N times
+# with computer.playvideo and reports the overhead per clip (wall time minus
+# the clip's own length), i.e. startup cost plus the delay noticing the end.
+# Needs VLC and python-vlc. Run from this folder: python bench_video.py clip.mp4 [times]
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+if len(sys.argv) < 2:
+    sys.exit("usage: python bench_video.py clip.mp4 [times]")
+CLIP = sys.argv[1]
+TIMES = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+start = time.perf_counter()
+first = System.computer.playvideo(CLIP)
+first_wall = time.perf_counter() - start
+length = first.duration
+print(f"clip {length:.2f}s, first play {first_wall:.2f}s (includes creating the VLC instance)")
+
+overheads = []
+for _ in range(TIMES):
+    start = time.perf_counter()
+    System.computer.playvideo(CLIP)
+    overheads.append(time.perf_counter() - start - length)
+overheads.sort()
+print(f"{TIMES} more plays: overhead per clip median {overheads[len(overheads) // 2] * 1000:.0f} ms, "
+      f"worst {overheads[-1] * 1000:.0f} ms")
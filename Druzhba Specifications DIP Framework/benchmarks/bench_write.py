@@ -0,0 +1,43 @@
+# CSV writing: the old one-writerow-per-row loop vs write_csv (writerows from
+# a generator, big buffer), plus what atomic=True and fsync=True add, and an
+# AppendWriter export. Run from this folder: python bench_write.py [rows]
+import csv, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import System
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+write = System.computer.file.write
+
+
+def rows():
+    for i in range(ROWS):
+        yield [i, f"name {i}", i * 0.25, "IT"]
+
+
+def per_row(path):
+    with open(path, "w", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=',')
+        for row in rows():
+            writer.writerow(row)
+
+
+def timed(name, run):
+    start = time.perf_counter()
+    run()
+    print(f"{name:<24} {time.perf_counter() - start:8.3f} s")
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "out.csv")
+    print(f"{ROWS} rows")
+    timed("writerow loop (old)", lambda: per_row(path))
+    timed("write_csv", lambda: write.write_csv(path, rows()))
+    timed("write_csv atomic", lambda: write.write_csv(path, rows(), atomic=True))
+    timed("write_csv atomic+fsync", lambda: write.write_csv(path, rows(), atomic=True, fsync=True))
+
+    def export():
+        with write.append_stream(os.path.join(tmp, "export.csv"), "csv") as out:
+            for row in rows():
+                out.write(row)
+    timed("append_stream", export)
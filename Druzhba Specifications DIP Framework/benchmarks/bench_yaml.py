@@ -0,0 +1,30 @@
+# Load/dump times for a large YAML document with PyYAML's pure Python
+# SafeLoader/Dumper against the libyaml C ones System uses when available.
+# Run from this folder: python bench_yaml.py [records]
+import io, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import yaml, System
+
+RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+doc = {"hosts": [{"name": f"host-{i:05d}", "ip": f"10.0.{i // 256 % 256}.{i % 256}", "port": 8000 + i % 100,
+                  "enabled": i % 3 != 0, "tags": ["web", "eu", f"rack-{i % 40}"], "weight": i / 7}
+                 for i in range(RECORDS)]}
+text = yaml.dump(doc, Dumper=System.YAML_DUMPER, default_flow_style=False)
+print(f"document: {RECORDS} records, {len(text) / 1e6:.1f} MB, System uses {System.YAML_BACKEND}")
+
+backends = [("pure-python", yaml.SafeLoader, yaml.Dumper)]
+if hasattr(yaml, "CSafeLoader"):
+    backends.append(("libyaml", yaml.CSafeLoader, yaml.CDumper))
+else:
+    print("libyaml not available in this PyYAML build, only timing pure-python")
+
+for name, loader, dumper in backends:
+    start = time.perf_counter()
+    loaded = yaml.load(io.StringIO(text), Loader=loader)
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    yaml.dump(loaded, io.StringIO(), Dumper=dumper, default_flow_style=False)
+    dump_time = time.perf_counter() - start
+    assert loaded == doc
+    print(f"{name:<12} load {load_time:7.3f}s   dump {dump_time:7.3f}s")